@@ -0,0 +1,83 @@
+import os
+import json
+import asyncio
+
+from tracing import Tracer
+
+
+class ArtifactWriter:
+    """Persists run artifacts (screenshots, reasoning, function calls) without blocking the agent loop.
+
+    Writes are queued and executed on worker threads. The queue is bounded: when the disk falls behind,
+    submitting waits for a free slot, so the agent slows down instead of buffering screenshots in memory.
+    """
+
+    def __init__(self, folder_path: str, max_pending: int = 32, num_workers: int = 2, tracer: Tracer = None):
+        self._folder_path = folder_path
+        if not os.path.exists(self._folder_path):
+            os.makedirs(self._folder_path)
+        self._max_pending = max_pending
+        self._num_workers = num_workers
+        self._tracer = tracer or Tracer()
+        self._queue = None
+        self._workers = []
+        self.written = 0
+        self.bytes_written = 0
+        self.errors = 0
+        # Total seconds the agent spent waiting for a free slot in the queue.
+        self.backpressure_time = 0.0
+
+    @property
+    def folder_path(self):
+        return self._folder_path
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_pending)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._num_workers)]
+
+    async def _worker(self):
+        while True:
+            path, data = await self._queue.get()
+            try:
+                with self._tracer.span("disk_write", track="io", bytes=len(data), file=os.path.basename(path)):
+                    await asyncio.to_thread(self._write, path, data)
+                self.written += 1
+                self.bytes_written += len(data)
+            except OSError as e:
+                self.errors += 1
+                print(f"Failed to write artifact {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        with open(path, "wb") as fp:
+            fp.write(data)
+
+    async def write_bytes(self, file_name: str, data: bytes):
+        self._ensure_started()
+        item = (os.path.join(self._folder_path, file_name), data)
+        if self._queue.full():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            with self._tracer.span("artifact_backpressure"):
+                await self._queue.put(item)
+            self.backpressure_time += loop.time() - start
+        else:
+            self._queue.put_nowait(item)
+
+    async def write_json(self, file_name: str, obj):
+        await self.write_bytes(file_name, json.dumps(obj, indent=2, default=str).encode("utf-8"))
+
+    async def flush(self):
+        if self._workers:
+            await self._queue.join()
+
+    async def close(self):
+        await self.flush()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+import traceback
+
+from google import genai
+
+from computers.browser_pool import BrowserPool
+from computers.playwright import AsyncPlaywrightComputer
+from computers.routing import RoutingPolicy, make_routing_policy
+from plan_cache import PlanCache
+from progress import ProgressMonitor
+from scheduler import RequestScheduler
+from trajectory import TrajectoryStore
+from tracing import Tracer
+from webagent import AsyncWebAgent, COMPUTER_USE_MODEL, MAX_TURNS, PLANNER_MODEL, PLAYWRIGHT_SCREEN_SIZE
+
+
+def load_tasks(input_path: str) -> list[dict]:
+    """Read one task per line.
+
+    Each task needs a "query"; "task_id", "initial_url", "auth_state" and "bypass_plan_cache" are optional.
+    """
+    tasks = []
+    with open(input_path, "r") as fp:
+        for line_number, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            task = json.loads(line)
+            if "query" not in task:
+                raise ValueError(f"Task on line {line_number} has no 'query' field.")
+            task.setdefault("task_id", str(line_number))
+            tasks.append(task)
+    return tasks
+
+
+class ResultWriter:
+    """Appends one JSON line per finished task, flushing after each so partial runs are kept."""
+
+    def __init__(self, output_path: str):
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        self._fp = open(output_path, "a")
+
+    def write(self, record: dict):
+        self._fp.write(json.dumps(record) + "\n")
+        self._fp.flush()
+
+    def close(self):
+        self._fp.close()
+
+
+class BatchRunner:
+    """Runs many tasks concurrently, each in its own BrowserContext on one shared Chromium.
+
+    All workers are coroutines on one event loop, so an agent waiting on the model or the browser
+    never holds a thread. Tasks on the default initial URL and auth state check out a warm context from a
+    BrowserPool; other tasks get a fresh context on the pool's browser. No task pays for a browser launch.
+    """
+
+    def __init__(
+            self,
+            output_path: str,
+            num_workers: int = 4,
+            initial_url: str = None,
+            context_state_path: str = None,
+            screenshot_root: str = None,
+            verbose: bool = False,
+            console=None,
+            plan_cache: PlanCache = None,
+            trajectory_store: TrajectoryStore = None,
+            replay: bool = True,
+            headless: bool = False,
+            routing: RoutingPolicy = None,
+            scheduler: RequestScheduler = None,
+            max_turns: int = MAX_TURNS
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1.")
+        if routing is not None and routing.har_mode == "record":
+            # Every context would record into the same file and overwrite it when it closes, idle warm ones last.
+            raise ValueError("HAR recording is not supported in batch mode, record single tasks with webagent.py.")
+        self._output_path = output_path
+        self._num_workers = num_workers
+        self._initial_url = initial_url
+        self._context_state_path = context_state_path
+        self._verbose = verbose
+        self._console = console
+        self._plan_cache = plan_cache
+        self._trajectory_store = trajectory_store
+        self._replay = replay
+        self._headless = headless
+        self._routing = routing
+        self._max_turns = max_turns
+        # One scheduler for all workers, so they share the rate limit.
+        self.scheduler = scheduler or RequestScheduler.default()
+        if screenshot_root is None:
+            screenshot_root = os.path.join("screenshots", "batch_" + time.strftime("%Y-%m-%d_%H-%M-%S"))
+        self._screenshot_root = screenshot_root
+        # All workers share one client, and with it one connection pool.
+        self._client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+
+    async def run(self, tasks: list[dict]) -> list[dict]:
+        task_queue = asyncio.Queue()
+        for task in tasks:
+            task_queue.put_nowait(task)
+
+        writer = ResultWriter(self._output_path)
+        results = []
+
+        num_workers = min(self._num_workers, len(tasks))
+        pool_kwargs = {"context_state_path": self._context_state_path}
+        if self._initial_url:
+            pool_kwargs["initial_url"] = self._initial_url
+        pool = BrowserPool(PLAYWRIGHT_SCREEN_SIZE, size=num_workers, headless=self._headless, routing=self._routing, **pool_kwargs)
+        await pool.start()
+        try:
+            await asyncio.gather(*(
+                self._worker(pool, task_queue, writer, results)
+                for _ in range(num_workers)
+            ))
+        finally:
+            writer.close()
+            await pool.close()
+        return results
+
+    async def _worker(self, pool: BrowserPool, task_queue: asyncio.Queue, writer: ResultWriter, results: list):
+        while not task_queue.empty():
+            task = task_queue.get_nowait()
+            record = await self._run_task(pool, task)
+            writer.write(record)
+            results.append(record)
+
+    async def _run_task(self, pool: BrowserPool, task: dict) -> dict:
+        task_id = str(task["task_id"])
+        record = {"task_id": task_id, "query": task["query"]}
+        start = time.perf_counter()
+        computer = None
+        agent = None
+        try:
+            auth_state = task.get("auth_state", self._context_state_path)
+            initial_url = task.get("initial_url", self._initial_url)
+            if auth_state == self._context_state_path and initial_url == self._initial_url:
+                computer_kwargs = {"pool": pool}
+            else:
+                computer_kwargs = {"context_state_path": auth_state, "browser": pool.browser, "routing": self._routing}
+                if initial_url:
+                    computer_kwargs["initial_url"] = initial_url
+            # Started by the agent, concurrently with planning.
+            computer = AsyncPlaywrightComputer(PLAYWRIGHT_SCREEN_SIZE, **computer_kwargs)
+            agent = AsyncWebAgent(
+                verbose=self._verbose,
+                console=self._console,
+                computer=computer,
+                client=self._client,
+                screenshot_dir=os.path.join(self._screenshot_root, task_id),
+                interactive=False,
+                plan_cache=self._plan_cache,
+                trajectory_store=self._trajectory_store,
+                tracer=Tracer(task_id),
+                scheduler=self.scheduler,
+                progress=ProgressMonitor(max_turns=self._max_turns)
+            )
+            record["result"] = await agent.run(
+                task["query"],
+                use_plan_cache=not task.get("bypass_plan_cache", False),
+                replay=self._replay
+            )
+            record["status"] = "success"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            record["traceback"] = traceback.format_exc()
+        finally:
+            if agent is not None:
+                await agent.close()
+            if computer is not None:
+                try:
+                    await computer.close()
+                except Exception:
+                    pass
+        record["iterations"] = agent.iteration if agent is not None else 0
+        if agent is not None:
+            record["latency"] = agent.tracer.summary()
+            record["progress"] = agent.progress.stats()
+        record["duration_s"] = round(time.perf_counter() - start, 3)
+        record["screenshot_dir"] = os.path.join(self._screenshot_root, task_id)
+        return record
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run many Web Agent tasks concurrently from a JSONL file.")
+    parser.add_argument("--input_path", type=str, required=True, help="JSONL file with one task per line.")
+    parser.add_argument("--output_path", type=str, required=True, help="JSONL file the per-task results are appended to.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of tasks to run at the same time.")
+    parser.add_argument("--auth_state", type=str, required=False)
+    parser.add_argument("--initial_url", type=str, required=False)
+    parser.add_argument("--no_plan_cache", action="store_true", help="Always ask the planner instead of reusing a cached plan.")
+    parser.add_argument("--no_replay", action="store_true", help="Do not replay recorded trajectories, always ask the model.")
+    parser.add_argument("--max_turns", type=int, default=MAX_TURNS, help="Abort a task after this many model turns.")
+    parser.add_argument("--requests_per_minute", type=float, required=False, help="Limit on requests per minute to each model, shared by all workers.")
+    parser.add_argument("--max_retries", type=int, default=4, help="Retries of rate-limited, failed or timed out model requests.")
+    parser.add_argument("--hedge", action="store_true", help="Send a duplicate of model requests slower than the p95 latency and keep the first reply.")
+    parser.add_argument("--headless", action="store_true", help="Run Chromium without a visible window.")
+    parser.add_argument("--block_resource_types", type=str, required=False, help="Comma separated resource types to block, e.g. 'media,font'.")
+    parser.add_argument("--block_trackers", action="store_true", help="Block common analytics, ads and session-recording domains.")
+    parser.add_argument("--asset_cache_dir", type=str, required=False, help="Serve static assets from an on-disk cache shared across runs.")
+    parser.add_argument("--har_path", type=str, required=False)
+    parser.add_argument("--har_mode", type=str, required=False, choices=["replay"], help="Replay traffic recorded by webagent.py from --har_path offline.")
+    args = parser.parse_args()
+
+    runner = BatchRunner(
+        output_path=args.output_path,
+        num_workers=args.workers,
+        initial_url=args.initial_url,
+        context_state_path=args.auth_state,
+        plan_cache=None if args.no_plan_cache else PlanCache(),
+        trajectory_store=TrajectoryStore(),
+        replay=not args.no_replay,
+        headless=args.headless,
+        routing=make_routing_policy(args.block_resource_types, args.block_trackers, args.asset_cache_dir, args.har_path, args.har_mode),
+        max_turns=args.max_turns,
+        scheduler=RequestScheduler(
+            requests_per_minute={model: args.requests_per_minute for model in (PLANNER_MODEL, COMPUTER_USE_MODEL)} if args.requests_per_minute else None,
+            max_retries=args.max_retries,
+            hedge=args.hedge
+        )
+    )
+    results = asyncio.run(runner.run(load_tasks(args.input_path)))
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    print(f"{succeeded}/{len(results)} tasks succeeded. Results written to {args.output_path}")
+    for model, stats in runner.scheduler.stats().items():
+        print(
+            f"{model}: {stats['requests']} requests, {stats['retries']} retries ({stats['rate_limited']} rate limited), "
+            f"{stats['hedges']} hedged ({stats['hedge_wins']} won), queue p50/p95: {stats['p50_queue_ms']:.0f}/{stats['p95_queue_ms']:.0f} ms"
+        )
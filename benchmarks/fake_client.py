@@ -0,0 +1,101 @@
+import asyncio
+
+from google.genai import types
+
+from webagent import PLANNER_MODEL
+
+
+def text_response(text: str) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                finish_reason=types.FinishReason.STOP
+            )
+        ]
+    )
+
+
+def function_call_response(reasoning: str, calls: list[tuple[str, dict]]) -> types.GenerateContentResponse:
+    parts = [types.Part(text=reasoning)] if reasoning else []
+    parts += [types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in calls]
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=parts),
+                finish_reason=types.FinishReason.STOP
+            )
+        ]
+    )
+
+
+class _FakeModels:
+    def __init__(self, client: "FakeGenaiClient"):
+        self._client = client
+
+    async def generate_content(self, model: str, contents, config: types.GenerateContentConfig = None):
+        return await self._client.respond(model, contents)
+
+    async def generate_content_stream(self, model: str, contents, config: types.GenerateContentConfig = None):
+        response = await self._client.respond(model, contents)
+        return self._client.stream(response)
+
+
+class _FakeAio:
+    def __init__(self, client: "FakeGenaiClient"):
+        self.models = _FakeModels(client)
+
+
+class FakeGenaiClient:
+    """Stand-in for genai.Client that answers from a script instead of calling Gemini.
+
+    The planner model gets `plan` back. Every computer-use request gets the next scripted turn, a
+    (reasoning, [(function name, args), ...]) pair, and once the script runs out the final answer is
+    returned as plain text, which ends the agent loop. `latency` adds a fixed delay to every request to
+    mimic the network; leave it at 0 to measure only the agent's own overhead. Streamed responses arrive one
+    part per chunk, chunk_latency apart.
+    """
+
+    def __init__(
+            self,
+            turns: list[tuple[str, list[tuple[str, dict]]]],
+            plan: str = "1. Follow the script.",
+            final_answer: str = "Done.",
+            latency: float = 0.0,
+            chunk_latency: float = 0.0
+    ):
+        self._turns = list(turns)
+        self._plan = plan
+        self._final_answer = final_answer
+        self._latency = latency
+        self._chunk_latency = chunk_latency
+        self._next_turn = 0
+        self.requests = 0
+        self.aio = _FakeAio(self)
+
+    async def respond(self, model: str, contents) -> types.GenerateContentResponse:
+        self.requests += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        if model == PLANNER_MODEL:
+            return text_response(self._plan)
+        if self._next_turn >= len(self._turns):
+            return text_response(self._final_answer)
+        reasoning, calls = self._turns[self._next_turn]
+        self._next_turn += 1
+        return function_call_response(reasoning, calls)
+
+    async def stream(self, response: types.GenerateContentResponse):
+        candidate = response.candidates[0]
+        for idx, part in enumerate(candidate.content.parts):
+            if idx and self._chunk_latency:
+                await asyncio.sleep(self._chunk_latency)
+            last = idx == len(candidate.content.parts) - 1
+            yield types.GenerateContentResponse(
+                candidates=[
+                    types.Candidate(
+                        content=types.Content(role="model", parts=[part]),
+                        finish_reason=candidate.finish_reason if last else None
+                    )
+                ]
+            )
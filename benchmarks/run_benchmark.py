@@ -0,0 +1,164 @@
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from rich.console import Console
+from rich.table import Table
+
+from history import ConversationHistory
+from tracing import Tracer, percentile
+from computers.encoding import ScreenshotEncoding
+from computers.frame_hash import FrameCache
+from computers.playwright import PlaywrightComputer
+from computers.settle import SettlePolicy
+from webagent import MAX_RECENT_TURN_WITH_SCREENSHOTS, PLAYWRIGHT_SCREEN_SIZE, WebAgent
+from benchmarks.fake_client import FakeGenaiClient
+from benchmarks.fixture_site import FixtureSite
+from benchmarks.scenarios import SCENARIOS, Scenario
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_scenario(scenario: Scenario, base_url: str, tracer: Tracer, args) -> dict:
+    client = FakeGenaiClient(scenario.turns, latency=args.model_latency, chunk_latency=args.chunk_latency)
+    computer = PlaywrightComputer(
+        PLAYWRIGHT_SCREEN_SIZE,
+        initial_url=base_url + scenario.start_path,
+        headless=not args.headed,
+        settle_policy=SettlePolicy(timeout=args.settle_timeout),
+        screenshot_encoding=ScreenshotEncoding(args.screenshot_format, args.screenshot_quality, args.screenshot_max_width),
+        frame_cache=FrameCache() if args.dedupe_screenshots else None,
+        observation_backend=args.observation_backend,
+        observation_mode=args.observation_mode
+    )
+    screenshot_dir = tempfile.mkdtemp(prefix=f"webagent_bench_{scenario.name}_")
+    agent = WebAgent(
+        verbose=False,
+        computer=computer,
+        client=client,
+        screenshot_dir=screenshot_dir,
+        interactive=False,
+        history=ConversationHistory(
+            max_turns_with_screenshots=MAX_RECENT_TURN_WITH_SCREENSHOTS,
+            max_tokens=args.max_prompt_tokens
+        ),
+        tracer=tracer,
+        stream=args.stream
+    )
+    first_span = len(tracer.spans)
+    start = time.perf_counter()
+    try:
+        agent.run(scenario.query, use_plan_cache=False, replay=False)
+        duration = time.perf_counter() - start
+        final_url = computer.url
+    finally:
+        agent.close()
+        computer.close()
+        if not args.keep_artifacts:
+            shutil.rmtree(screenshot_dir, ignore_errors=True)
+
+    steps = sum(len(calls) for _, calls in scenario.turns)
+    prompt_bytes = [span.attrs.get("prompt_bytes", 0) for span in tracer.spans[first_span:] if span.name == "model_call"]
+    return {
+        "scenario": scenario.name,
+        "ok": scenario.expected_url in final_url,
+        "final_url": final_url,
+        "duration_s": duration,
+        "steps": steps,
+        "steps_per_s": steps / duration,
+        "model_requests": client.requests,
+        "max_prompt_bytes": max(prompt_bytes, default=0),
+        "screenshot_dir": screenshot_dir if args.keep_artifacts else None,
+    }
+
+
+def main(args):
+    console = Console()
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    if args.trace_memory:
+        tracemalloc.start()
+
+    report = {"config": vars(args), "scenarios": {}}
+    with FixtureSite() as site:
+        for name in names:
+            scenario = SCENARIOS[name](site.base_url)
+            tracer = Tracer(name)
+            for _ in range(args.warmup):
+                run_scenario(scenario, site.base_url, Tracer(name), args)
+            runs = [run_scenario(scenario, site.base_url, tracer, args) for _ in range(args.repeat)]
+            durations = sorted(run["duration_s"] for run in runs)
+            stages = tracer.summary()
+            report["scenarios"][name] = {
+                "runs": runs,
+                "ok": sum(run["ok"] for run in runs),
+                "p50_duration_s": percentile(durations, 50),
+                "p95_duration_s": percentile(durations, 95),
+                "steps_per_s": sum(run["steps"] for run in runs) / sum(durations),
+                "actions": {k[len("action."):]: v for k, v in stages.items() if k.startswith("action.")},
+                "stages": {k: v for k, v in stages.items() if not k.startswith("action.")},
+                "max_rss_mb": max_rss_mb(),
+            }
+            if args.trace_memory:
+                report["scenarios"][name]["peak_python_heap_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.reset_peak()
+            if args.verbose:
+                console.print(tracer.summary_table())
+
+    table = Table(title="Web Agent benchmark", expand=False)
+    for column in ("Scenario", "OK", "Steps/s", "p50 run (s)", "p95 run (s)", "Max RSS (MB)"):
+        table.add_column(column, justify="left" if column == "Scenario" else "right")
+    for name, result in report["scenarios"].items():
+        table.add_row(
+            name,
+            f"{result['ok']}/{len(result['runs'])}",
+            f"{result['steps_per_s']:.2f}",
+            f"{result['p50_duration_s']:.2f}",
+            f"{result['p95_duration_s']:.2f}",
+            f"{result['max_rss_mb']:.0f}"
+        )
+    console.print(table)
+
+    actions = Table(title="Per-action latency", expand=False)
+    for column in ("Scenario", "Action", "Count", "p50 (ms)", "p95 (ms)"):
+        actions.add_column(column, justify="left" if column in ("Scenario", "Action") else "right")
+    for name, result in report["scenarios"].items():
+        for action, stats in result["actions"].items():
+            actions.add_row(name, action, str(stats["count"]), f"{stats['p50_ms']:.1f}", f"{stats['p95_ms']:.1f}")
+    console.print(actions)
+
+    if args.output_path:
+        with open(args.output_path, "w") as fp:
+            json.dump(report, fp, indent=2, default=str)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the agent loop offline against a local fixture site and a scripted model.")
+    parser.add_argument("--scenarios", type=str, required=False, help=f"Comma separated subset of: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured runs per scenario.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per scenario before the measured ones.")
+    parser.add_argument("--model_latency", type=float, default=0.0, help="Seconds the fake model waits before every response.")
+    parser.add_argument("--chunk_latency", type=float, default=0.0, help="Seconds between the chunks of a streamed fake response.")
+    parser.add_argument("--stream", action="store_true", help="Run the agent in streaming mode.")
+    parser.add_argument("--settle_timeout", type=float, default=5.0)
+    parser.add_argument("--screenshot_format", type=str, default="png", choices=["png", "jpeg", "webp"])
+    parser.add_argument("--screenshot_quality", type=int, default=80)
+    parser.add_argument("--screenshot_max_width", type=int, required=False)
+    parser.add_argument("--dedupe_screenshots", action="store_true")
+    parser.add_argument("--observation_backend", type=str, default="screenshot", choices=["screenshot", "screencast"])
+    parser.add_argument("--observation_mode", type=str, default="screenshot", choices=["screenshot", "accessibility", "hybrid"])
+    parser.add_argument("--max_prompt_tokens", type=int, required=False)
+    parser.add_argument("--trace_memory", action="store_true", help="Also report the peak Python heap (slows the run down).")
+    parser.add_argument("--keep_artifacts", action="store_true", help="Keep the screenshots and traces of every run.")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window.")
+    parser.add_argument("--output_path", type=str, required=False, help="Write the full report as JSON.")
+    parser.add_argument("--verbose", action="store_true", help="Print the per-stage latency table of every scenario.")
+    main(parser.parse_args())
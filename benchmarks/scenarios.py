@@ -0,0 +1,82 @@
+from webagent import PLAYWRIGHT_SCREEN_SIZE
+
+
+def at(x: int, y: int) -> dict:
+    """Pixel position on the fixture site, in the model's 0-1000 coordinate space."""
+    return {
+        "x": round(x / PLAYWRIGHT_SCREEN_SIZE[0] * 1000),
+        "y": round(y / PLAYWRIGHT_SCREEN_SIZE[1] * 1000),
+    }
+
+
+class Scenario:
+    """A scripted task on the fixture site.
+
+    turns are the model's responses in order, see FakeGenaiClient. The run counts as correct when the
+    final URL contains expected_url.
+    """
+
+    def __init__(self, name: str, query: str, start_path: str, turns: list, expected_url: str):
+        self.name = name
+        self.query = query
+        self.start_path = start_path
+        self.turns = turns
+        self.expected_url = expected_url
+
+
+def form_scenario(base_url: str) -> Scenario:
+    return Scenario(
+        name="form",
+        query="Send a message to Ada through the contact form.",
+        start_path="form.html",
+        turns=[
+            ("Fill in the name.", [("type_text_at", {**at(300, 120), "text": "Ada Lovelace", "press_enter": False})]),
+            ("Fill in the email and the message.", [
+                ("type_text_at", {**at(300, 200), "text": "ada@example.com", "press_enter": False}),
+                ("type_text_at", {**at(300, 320), "text": "Hello from the benchmark.\nSecond line.", "press_enter": False}),
+            ]),
+            ("Submit the form.", [("click_at", at(200, 445))]),
+        ],
+        expected_url="done.html?name=Ada"
+    )
+
+
+def scroll_scenario(base_url: str) -> Scenario:
+    return Scenario(
+        name="scroll",
+        query="Find the last row of the panel on the list page.",
+        start_path="index.html",
+        turns=[
+            ("Open the list.", [("click_at", at(300, 220))]),
+            ("Scroll the page.", [("scroll_document", {"direction": "down"})]),
+            ("Keep scrolling.", [("scroll_document", {"direction": "down"})]),
+            ("Scroll the panel instead.", [("scroll_at", {**at(1050, 400), "direction": "down", "magnitude": 800})]),
+            ("Scroll the panel further.", [("scroll_at", {**at(1050, 400), "direction": "down", "magnitude": 800})]),
+            ("Back to the top.", [("key_combination", {"keys": "control+home"})]),
+            ("Go home.", [("navigate", {"url": base_url + "index.html"})]),
+        ],
+        expected_url="index.html"
+    )
+
+
+def tabs_scenario(base_url: str) -> Scenario:
+    return Scenario(
+        name="tabs",
+        query="Open the link that opens in a new tab.",
+        start_path="tabs.html",
+        turns=[
+            ("Hover the link first.", [("hover_at", at(300, 120))]),
+            ("Click it.", [("click_at", at(300, 120))]),
+            ("Go back to the links.", [("go_back", {})]),
+            ("And forward again.", [("go_forward", {})]),
+            ("Try the other link.", [("go_back", {}), ("click_at", at(300, 200))]),
+        ],
+        expected_url="done.html?from=link"
+    )
+
+
+SCENARIOS = {
+    "form": form_scenario,
+    "scroll": scroll_scenario,
+    "tabs": tabs_scenario,
+}
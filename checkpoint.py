@@ -0,0 +1,140 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+from enum import Enum
+
+from google.genai import types
+
+CONTENTS_FILE = "contents.jsonl"
+STATE_FILE = "state.json"
+STORAGE_STATE_FILE = "storage_state.json"
+BLOB_DIR = "blobs"
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+def _inline_data_dicts(content: dict):
+    for part in content.get("parts") or []:
+        if part.get("inline_data"):
+            yield part["inline_data"]
+        for response_part in (part.get("function_response") or {}).get("parts") or []:
+            if response_part.get("inline_data"):
+                yield response_part["inline_data"]
+
+
+def snapshot_content(content: types.Content) -> dict:
+    """Copy of a Content that later changes to it (e.g. the history stripping old screenshots) do not affect.
+
+    The image bytes are shared with the original, not copied.
+    """
+    return content.model_dump(exclude_none=True)
+
+
+class Checkpoint:
+    """Checkpoint of an agent run that a restarted process can continue from.
+
+    The conversation is an append-only log with one Content per line, so each turn only writes what it added.
+    Screenshots are stored out of line under their SHA-256, so an unchanged screen is stored once and the log
+    lines stay small. state.json is replaced atomically after every turn and records how many log lines belong
+    to the checkpoint, which makes a line torn by a crash harmless. The browser storage state (cookies and
+    local storage) is saved next to it.
+    """
+
+    def __init__(self, folder_path: str):
+        self.folder_path = folder_path
+        self._blob_path = os.path.join(folder_path, BLOB_DIR)
+        self._known_blobs = set()
+        self.entries = 0
+
+    @property
+    def storage_state_path(self):
+        return os.path.join(self.folder_path, STORAGE_STATE_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.folder_path, STATE_FILE))
+
+    def ensure_folder(self):
+        """Create the checkpoint folder, including the one screenshots are stored in."""
+        if not os.path.exists(self._blob_path):
+            os.makedirs(self._blob_path)
+
+    def _store_blob(self, data: bytes, mime_type: str) -> str:
+        name = f"{hashlib.sha256(data).hexdigest()}.{EXTENSIONS.get(mime_type, 'bin')}"
+        if name not in self._known_blobs:
+            path = os.path.join(self._blob_path, name)
+            if not os.path.exists(path):
+                with open(path + ".tmp", "wb") as fp:
+                    fp.write(data)
+                os.replace(path + ".tmp", path)
+            self._known_blobs.add(name)
+        return name
+
+    def _append(self, contents: list[dict], reset: bool):
+        self.ensure_folder()
+        lines = []
+        for content in contents:
+            for inline_data in _inline_data_dicts(content):
+                inline_data["blob"] = self._store_blob(inline_data.pop("data"), inline_data.get("mime_type"))
+            lines.append(json.dumps(content, default=_json_default) + "\n")
+        with open(os.path.join(self.folder_path, CONTENTS_FILE), "w" if reset else "a") as fp:
+            fp.writelines(lines)
+
+    def _write_state(self, state: dict):
+        path = os.path.join(self.folder_path, STATE_FILE)
+        with open(path + ".tmp", "w") as fp:
+            json.dump(state, fp, indent=2)
+        os.replace(path + ".tmp", path)
+
+    async def save(self, contents: list[dict], state: dict, reset: bool = False):
+        """Append snapshots of the Contents added since the last save, then point the state at them."""
+        await asyncio.to_thread(self._append, contents, reset)
+        self.entries = len(contents) if reset else self.entries + len(contents)
+        await asyncio.to_thread(self._write_state, {**state, "entries": self.entries, "saved_at": time.time()})
+
+    def read_state(self) -> dict:
+        with open(os.path.join(self.folder_path, STATE_FILE), "r") as fp:
+            return json.load(fp)
+
+    async def load_state(self) -> dict:
+        return await asyncio.to_thread(self.read_state)
+
+    def _read_contents(self, entries: int) -> list[types.Content]:
+        contents = []
+        with open(os.path.join(self.folder_path, CONTENTS_FILE), "r") as fp:
+            for _, line in zip(range(entries), fp):
+                content = json.loads(line)
+                for inline_data in _inline_data_dicts(content):
+                    with open(os.path.join(self._blob_path, inline_data["blob"]), "rb") as blob:
+                        inline_data["data"] = blob.read()
+                    self._known_blobs.add(inline_data.pop("blob"))
+                contents.append(types.Content.model_validate_json(json.dumps(content, default=_json_default)))
+        return contents
+
+    async def load_contents(self, entries: int) -> list[types.Content]:
+        """Load the first `entries` Contents of the log, i.e. the ones the state refers to."""
+        contents = await asyncio.to_thread(self._read_contents, entries)
+        self.entries = entries
+        return contents
+
+    def _truncate(self, entries: int):
+        path = os.path.join(self.folder_path, CONTENTS_FILE)
+        with open(path, "r") as fp:
+            lines = [line for _, line in zip(range(entries), fp)]
+        with open(path + ".tmp", "w") as fp:
+            fp.writelines(lines)
+        os.replace(path + ".tmp", path)
+
+    async def truncate(self, entries: int):
+        """Drop log lines written after the checkpoint, so appends continue from it."""
+        await asyncio.to_thread(self._truncate, entries)
+        self.entries = entries
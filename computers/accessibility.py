@@ -0,0 +1,160 @@
+from playwright.async_api import Page, Error as PlaywrightError
+
+# Walks the DOM and returns the nodes visible in the viewport with their ARIA role, accessible name, state and
+# center. Controls, headings and links take their text as their name, so their content is not repeated;
+# containers only show up when they are labelled. Text outside any named node is kept as "text" nodes.
+ACCESSIBILITY_SNAPSHOT_SCRIPT = """
+(maxNodes) => {
+  const vw = window.innerWidth, vh = window.innerHeight;
+  const NAME_FROM_CONTENT = new Set([
+    "link", "button", "heading", "option", "tab", "menuitem", "menuitemcheckbox", "menuitemradio",
+    "checkbox", "radio", "switch", "treeitem", "cell", "gridcell", "columnheader", "rowheader", "img",
+  ]);
+  const TEXT_INPUTS = new Set(["textbox", "searchbox", "combobox"]);
+  const INPUT_ROLES = {
+    checkbox: "checkbox", radio: "radio", button: "button", submit: "button", reset: "button",
+    range: "slider", search: "searchbox", hidden: null,
+  };
+  const TAG_ROLES = {
+    A: "link", BUTTON: "button", SELECT: "combobox", TEXTAREA: "textbox", SUMMARY: "button", OPTION: "option",
+    H1: "heading", H2: "heading", H3: "heading", H4: "heading", H5: "heading", H6: "heading",
+    IMG: "img", DIALOG: "dialog", TH: "columnheader", TD: "cell",
+  };
+  const clean = (text) => (text || "").replace(/\\s+/g, " ").trim().slice(0, 100);
+  const roleOf = (el) => {
+    const explicit = el.getAttribute("role");
+    if (explicit) return explicit.split(" ")[0];
+    if (el.tagName === "INPUT") {
+      const type = (el.getAttribute("type") || "text").toLowerCase();
+      return type in INPUT_ROLES ? INPUT_ROLES[type] : "textbox";
+    }
+    if (el.tagName === "A" && !el.hasAttribute("href")) return null;
+    if (el.isContentEditable && !(el.parentElement && el.parentElement.isContentEditable)) return "textbox";
+    return TAG_ROLES[el.tagName] || null;
+  };
+  const labelOf = (el) => {
+    const labelledBy = el.getAttribute("aria-labelledby");
+    if (labelledBy) {
+      const label = labelledBy.split(" ").map((id) => document.getElementById(id)).filter(Boolean);
+      if (label.length) return label.map((node) => node.innerText).join(" ");
+    }
+    if (el.labels && el.labels.length) return el.labels[0].innerText;
+    return el.getAttribute("aria-label") || el.getAttribute("alt") || el.getAttribute("title") || "";
+  };
+  const stateOf = (el, role) => {
+    const state = [];
+    if (el.disabled || el.getAttribute("aria-disabled") === "true") state.push("disabled");
+    if (el.checked || el.getAttribute("aria-checked") === "true") state.push("checked");
+    if (el.getAttribute("aria-selected") === "true") state.push("selected");
+    const expanded = el.getAttribute("aria-expanded");
+    if (expanded) state.push(expanded === "true" ? "expanded" : "collapsed");
+    if (TEXT_INPUTS.has(role)) {
+      const value = el.isContentEditable ? el.innerText : el.value;
+      if (value) state.push(`value="${clean(value)}"`);
+    }
+    if (document.activeElement === el) state.push("focused");
+    return state;
+  };
+  const center = (rect) => {
+    if (rect.width < 1 || rect.height < 1 || rect.bottom <= 0 || rect.right <= 0 || rect.top >= vh || rect.left >= vw) {
+      return null;
+    }
+    const left = Math.max(rect.left, 0), top = Math.max(rect.top, 0);
+    const right = Math.min(rect.right, vw), bottom = Math.min(rect.bottom, vh);
+    return [(left + right) / 2, (top + bottom) / 2];
+  };
+  const nodes = [];
+  const visit = (el, named) => {
+    if (nodes.length >= maxNodes) return;
+    const style = window.getComputedStyle(el);
+    if (style.display === "none" || style.visibility === "hidden" || el.getAttribute("aria-hidden") === "true") return;
+    const role = roleOf(el);
+    if (role && !named) {
+      const fromContent = NAME_FROM_CONTENT.has(role);
+      let name = clean(labelOf(el));
+      if (!name && fromContent) name = clean(el.innerText);
+      if (!name && TEXT_INPUTS.has(role)) name = clean(el.getAttribute("placeholder"));
+      const position = center(el.getBoundingClientRect());
+      if (position && (name || fromContent || TEXT_INPUTS.has(role))) {
+        nodes.push({ role, name, state: stateOf(el, role), x: position[0], y: position[1] });
+      }
+      named = fromContent || TEXT_INPUTS.has(role);
+    }
+    for (const child of el.childNodes) {
+      if (nodes.length >= maxNodes) return;
+      if (child.nodeType === Node.ELEMENT_NODE) {
+        visit(child, named);
+      } else if (child.nodeType === Node.TEXT_NODE && !named) {
+        const text = clean(child.textContent);
+        if (!text) continue;
+        const range = document.createRange();
+        range.selectNodeContents(child);
+        const position = center(range.getBoundingClientRect());
+        if (position) nodes.push({ role: "text", name: text, state: [], x: position[0], y: position[1] });
+      }
+    }
+  };
+  if (document.body) visit(document.body, false);
+  return { nodes, width: vw, height: vh, truncated: nodes.length >= maxNodes };
+}
+"""
+
+FULL_SNAPSHOT_HEADER = 'Accessibility snapshot of the viewport, one node per line as role "name" [state] @(x,y) in 0-1000 coordinates:'
+DIFF_SNAPSHOT_HEADER = "Accessibility snapshot changes since the previous one (- removed, + added):"
+NO_CHANGE_NOTE = "The accessibility snapshot did not change."
+
+
+def format_node(node: dict, width: int, height: int) -> str:
+    line = node["role"]
+    if node["name"]:
+        line += f' "{node["name"]}"'
+    if node["state"]:
+        line += f" [{', '.join(node['state'])}]"
+    return line + f" @({round(node['x'] / width * 1000)},{round(node['y'] / height * 1000)})"
+
+
+class AccessibilityTracker:
+    """Captures pruned accessibility snapshots of the viewport as text, diffed against the previous one.
+
+    A diff is sent instead of the full snapshot while it is less than half the size, and a full snapshot at
+    least every full_every observations, so the model never has to go far back to rebuild the page.
+    Shadow roots and iframes are not traversed.
+    """
+
+    def __init__(self, max_nodes: int = 400, full_every: int = 5):
+        self.max_nodes = max_nodes
+        self.full_every = full_every
+        self._previous = None
+        self._since_full = 0
+
+    def reset(self):
+        self._previous = None
+        self._since_full = 0
+
+    async def _capture(self, page: Page) -> list[str]:
+        try:
+            snapshot = await page.evaluate(ACCESSIBILITY_SNAPSHOT_SCRIPT, self.max_nodes)
+        except PlaywrightError:
+            # The document was replaced while the script ran; try once more on the new one.
+            await page.wait_for_load_state()
+            snapshot = await page.evaluate(ACCESSIBILITY_SNAPSHOT_SCRIPT, self.max_nodes)
+        lines = [format_node(node, snapshot["width"], snapshot["height"]) for node in snapshot["nodes"]]
+        if snapshot["truncated"]:
+            lines.append(f"(truncated after {self.max_nodes} nodes)")
+        return lines
+
+    async def observe(self, page: Page) -> str:
+        lines = await self._capture(page)
+        previous, self._previous = self._previous, lines
+        if previous is not None and self._since_full < self.full_every:
+            previous_set, current_set = set(previous), set(lines)
+            removed = [f"- {line}" for line in previous if line not in current_set]
+            added = [f"+ {line}" for line in lines if line not in previous_set]
+            if not removed and not added:
+                self._since_full += 1
+                return NO_CHANGE_NOTE
+            if len(removed) + len(added) < len(lines) / 2:
+                self._since_full += 1
+                return "\n".join([DIFF_SNAPSHOT_HEADER] + removed + added)
+        self._since_full = 0
+        return "\n".join([FULL_SNAPSHOT_HEADER] + lines)
@@ -0,0 +1,122 @@
+import asyncio
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+from computers.playwright import PLAYWRIGHT_BROWSER_ARGS, new_agent_context
+from computers.routing import RoutingPolicy
+
+EMPTY_STORAGE_STATE = {"cookies": [], "origins": []}
+
+
+class WarmContext:
+    """A browser context with the auth state applied and one page already on the initial URL."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserPool:
+    """Long-lived Chromium with a set of warm contexts ready to be checked out.
+
+    Contexts are created, authenticated and navigated ahead of time, so a PlaywrightComputer started on the
+    pool begins on a loaded page. Returned contexts are reset in the background before they are handed out
+    again: with reuse_contexts the context is kept (pages closed, which drops their session storage, cookies,
+    local storage and IndexedDB replaced by the saved auth state, a fresh page opened on the initial URL),
+    otherwise it is closed and a brand new one replaces it. Playwright releases without
+    BrowserContext.set_storage_state cannot reset storage in place, so there contexts are always replaced.
+    """
+
+    def __init__(
+            self,
+            screen_size: tuple[int, int],
+            initial_url: str = "https://www.google.com",
+            context_state_path: str = None,
+            size: int = 2,
+            headless: bool = False,
+            reuse_contexts: bool = False,
+            max_uses: int = 20,
+            routing: RoutingPolicy = None
+    ):
+        self._screen_size = screen_size
+        self.initial_url = initial_url
+        self._context_state_path = context_state_path
+        self._size = size
+        self._headless = headless
+        self._reuse_contexts = reuse_contexts
+        self._max_uses = max_uses
+        self._routing = routing
+        self._playwright = None
+        self.browser: Browser = None
+        self._ready = None
+        self._background = set()
+        self._closed = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(
+            args=PLAYWRIGHT_BROWSER_ARGS,
+            headless=self._headless
+        )
+        self._ready = asyncio.Queue()
+        warm_contexts = await asyncio.gather(*(self._create() for _ in range(self._size)))
+        for warm in warm_contexts:
+            self._ready.put_nowait(warm)
+
+    async def close(self):
+        self._closed = True
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        while not self._ready.empty():
+            await self._ready.get_nowait().context.close()
+        await self.browser.close()
+        await self._playwright.stop()
+
+    async def _create(self) -> WarmContext:
+        context = await new_agent_context(self.browser, self._screen_size, self._context_state_path, self._routing)
+        page = await context.new_page()
+        await page.goto(self.initial_url)
+        return WarmContext(context, page)
+
+    async def acquire(self) -> WarmContext:
+        """Check out a warm context, creating one on the spot if all of them are in use."""
+        if self._ready.empty():
+            warm = await self._create()
+        else:
+            warm = self._ready.get_nowait()
+        warm.uses += 1
+        return warm
+
+    async def release(self, warm: WarmContext):
+        """Return a context to the pool. The reset runs in the background, off the caller's critical path."""
+        task = asyncio.create_task(self._reset(warm))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _reset(self, warm: WarmContext):
+        try:
+            if self._closed or self._ready.qsize() >= self._size:
+                await warm.context.close()
+                return
+            if self._reuse_contexts and warm.uses < self._max_uses and hasattr(warm.context, "set_storage_state"):
+                for page in warm.context.pages:
+                    await page.close()
+                await warm.context.clear_permissions()
+                # Clears cookies, local storage and IndexedDB of every origin, not only the saved ones.
+                await warm.context.set_storage_state(self._context_state_path or EMPTY_STORAGE_STATE)
+                warm.page = await warm.context.new_page()
+                await warm.page.goto(self.initial_url)
+            else:
+                await warm.context.close()
+                warm = await self._create()
+            self._ready.put_nowait(warm)
+        except Exception as e:
+            print(f"Failed to reset pooled browser context: {e}")
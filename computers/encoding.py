@@ -0,0 +1,79 @@
+import io
+import asyncio
+from PIL import Image
+from playwright.async_api import Page
+
+MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+EXTENSIONS = {
+    "png": "png",
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+
+class ScreenshotEncoding:
+    """How observations are encoded before they are sent to the model and written to disk.
+
+    image_format: "png", "jpeg" or "webp".
+    quality: 1-100, used by the lossy formats.
+    max_width: downscale wider screenshots to this width before upload, keeping the aspect ratio.
+        The model answers in normalized 0-1000 coordinates, which are denormalized against the
+        viewport rather than the image, so clicks stay correct at any scale.
+    """
+
+    def __init__(self, image_format: str = "png", quality: int = 80, max_width: int = None):
+        if image_format not in MIME_TYPES:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self.image_format = image_format
+        self.quality = quality
+        self.max_width = max_width
+
+    @property
+    def mime_type(self):
+        return MIME_TYPES[self.image_format]
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self.image_format]
+
+
+def encode_image(png_bytes: bytes, encoding: ScreenshotEncoding) -> bytes:
+    image = Image.open(io.BytesIO(png_bytes))
+    if encoding.max_width and image.width > encoding.max_width:
+        height = round(image.height * encoding.max_width / image.width)
+        image = image.resize((encoding.max_width, height), Image.LANCZOS)
+
+    output = io.BytesIO()
+    if encoding.image_format == "png":
+        image.save(output, format="PNG")
+    elif encoding.image_format == "jpeg":
+        image.convert("RGB").save(output, format="JPEG", quality=encoding.quality)
+    else:
+        image.save(output, format="WEBP", quality=encoding.quality)
+    return output.getvalue()
+
+
+async def capture_screenshot(page: Page, encoding: ScreenshotEncoding, png_frame: bytes = None) -> bytes:
+    """Take a viewport screenshot in the requested encoding, doing as little work as possible.
+
+    png_frame is an already captured PNG (e.g. from the settle check) that is reused instead of a new capture.
+    """
+    needs_resize = encoding.max_width and page.viewport_size and page.viewport_size["width"] > encoding.max_width
+    if png_frame is None and not needs_resize:
+        # Chromium encodes PNG and JPEG itself, so no second pass is needed.
+        if encoding.image_format == "png":
+            return await page.screenshot(type="png", full_page=False)
+        if encoding.image_format == "jpeg":
+            return await page.screenshot(type="jpeg", quality=encoding.quality, full_page=False)
+
+    if png_frame is None:
+        png_frame = await page.screenshot(type="png", full_page=False)
+    if encoding.image_format == "png" and not needs_resize:
+        return png_frame
+    # Re-encoding a full viewport takes tens of milliseconds, keep it off the event loop.
+    return await asyncio.to_thread(encode_image, png_frame, encoding)
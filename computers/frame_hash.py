@@ -0,0 +1,107 @@
+import io
+import math
+from PIL import Image, ImageChops
+
+# Gemini bills images larger than 384px per 768x768 tile, 258 tokens each.
+IMAGE_TOKENS_PER_TILE = 258
+IMAGE_TILE_SIZE = 768
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a tiny grayscale thumbnail."""
+    thumbnail = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = list(thumbnail.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def compute_frame_hash(screenshot: bytes) -> str:
+    return f"{dhash(Image.open(io.BytesIO(screenshot))):016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    return IMAGE_TOKENS_PER_TILE * math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE)
+
+
+class FrameCache:
+    """Remembers the previous frame and detects when a new one is the same or nearly the same.
+
+    A frame counts as unchanged when its perceptual hash is within max_distance bits of the previous one
+    and, to avoid hiding small but meaningful edits such as a typed character, at most max_changed_pixels
+    pixels differ by more than pixel_tolerance. A blinking caret passes, a new line of text does not.
+    """
+
+    def __init__(self, max_distance: int = 0, max_changed_pixels: int = 64, pixel_tolerance: int = 16):
+        self.max_distance = max_distance
+        self.max_changed_pixels = max_changed_pixels
+        self.pixel_tolerance = pixel_tolerance
+        self._previous_bytes = None
+        self._previous_image = None
+        self._previous_hash = None
+        self.frames = 0
+        self.hits = 0
+        self.bytes_saved = 0
+        self.tokens_saved = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.frames if self.frames else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate,
+            "bytes_saved": self.bytes_saved,
+            "estimated_tokens_saved": self.tokens_saved,
+        }
+
+    def _count_changed_pixels(self, image: Image.Image) -> int:
+        if image.size != self._previous_image.size:
+            return image.width * image.height
+        diff = ImageChops.difference(image, self._previous_image).convert("L")
+        histogram = diff.histogram()
+        return sum(histogram[self.pixel_tolerance + 1:])
+
+    def observe(self, screenshot: bytes) -> tuple[str, bool]:
+        """Return the frame's hash as hex and whether it is unchanged from the previous frame.
+
+        Decodes the image, so call it off the event loop.
+        """
+        self.frames += 1
+        if screenshot == self._previous_bytes:
+            unchanged = True
+            frame_hash = self._previous_hash
+        else:
+            image = Image.open(io.BytesIO(screenshot)).convert("RGB")
+            frame_hash = dhash(image)
+            unchanged = (
+                self._previous_image is not None
+                and hamming_distance(frame_hash, self._previous_hash) <= self.max_distance
+                and self._count_changed_pixels(image) <= self.max_changed_pixels
+            )
+            # Compare against the frame the model actually saw last, not a drifting chain of near-duplicates.
+            if not unchanged:
+                self._previous_image = image
+                self._previous_hash = frame_hash
+                self._previous_bytes = screenshot
+
+        if unchanged:
+            self.hits += 1
+            self.bytes_saved += len(screenshot)
+            self.tokens_saved += estimate_image_tokens(*self._previous_image.size)
+        return f"{frame_hash:016x}", unchanged
+
+    def reset(self):
+        self._previous_bytes = None
+        self._previous_image = None
+        self._previous_hash = None
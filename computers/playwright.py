@@ -1,8 +1,19 @@
 # https://github.com/google-gemini/computer-use-preview/blob/main/computers/playwright/playwright.py
 
-import time
-from typing import Literal
-from playwright.sync_api import sync_playwright, Page
+import asyncio
+from typing import Literal, TYPE_CHECKING
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Error as PlaywrightError
+
+from computers.accessibility import AccessibilityTracker
+from computers.encoding import ScreenshotEncoding, capture_screenshot
+from computers.frame_hash import FrameCache, compute_frame_hash
+from computers.routing import RoutingPolicy, install_routing
+from computers.screencast import ScreencastRecorder
+from computers.settle import DOM_MUTATION_TRACKER_SCRIPT, PageSettler, SettlePolicy
+from tracing import Tracer, traced
+
+if TYPE_CHECKING:
+    from computers.browser_pool import BrowserPool
 
 
 PLAYWRIGHT_KEY_MAP = {
@@ -48,76 +59,329 @@ PLAYWRIGHT_KEY_MAP = {
     "command": "Meta",  # 'Meta' is Command on macOS, Windows key on Windows
 }
 
+# How the focused element can take text: "fillable" (text input or textarea), "editable" (contenteditable) or "none".
+FOCUSED_TEXT_TARGET_SCRIPT = """
+() => {
+  const el = document.activeElement;
+  if (!el || el === document.body || el.disabled || el.readOnly) return "none";
+  if (el.isContentEditable) return "editable";
+  if (el.tagName === "TEXTAREA") return "fillable";
+  if (el.tagName === "INPUT") {
+    const type = (el.getAttribute("type") || "text").toLowerCase();
+    return ["text", "search", "email", "url", "tel", "password", "number"].includes(type) ? "fillable" : "none";
+  }
+  return "none";
+}
+"""
+
+# Width of the screenshot sent alongside the accessibility snapshot in "hybrid" mode, unless set explicitly.
+HYBRID_SCREENSHOT_MAX_WIDTH = 512
+
+PLAYWRIGHT_BROWSER_ARGS = [
+    "--disable-extensions",
+    "--disable-file-system",
+    "--disable-plugins",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+]
+
+
+
+async def new_agent_context(
+        browser: Browser,
+        screen_size: tuple[int, int],
+        context_state_path: str = None,
+        routing: RoutingPolicy = None
+) -> BrowserContext:
+    """Create an isolated context with the agent's viewport, auth state, request routing and page instrumentation."""
+    context = await browser.new_context(
+        storage_state=context_state_path,
+        viewport={
+            "width": screen_size[0],
+            "height": screen_size[1]
+        }
+    )
+    await context.add_init_script(DOM_MUTATION_TRACKER_SCRIPT)
+    if routing is not None:
+        await install_routing(context, routing)
+    return context
 
 
 class EnvState:
-    def __init__(self, screenshot: bytes, url: str):
+    def __init__(
+            self,
+            screenshot: bytes,
+            url: str,
+            settle_time: float = None,
+            mime_type: str = "image/png",
+            extension: str = "png",
+            frame_hash: str = None,
+            unchanged: bool = False,
+            accessibility: str = None
+    ):
         self.screenshot = screenshot
         self.url = url
-
-class PlaywrightComputer:
+        # Accessibility snapshot (or its diff against the previous one) in the accessibility/hybrid modes.
+        self.accessibility = accessibility
+        # Perceptual hash of the screenshot, and whether it matches the previous observation.
+        self.frame_hash = frame_hash
+        self.unchanged = unchanged
+        # Encoding of the screenshot bytes, shared by the model payload and the on-disk copy.
+        self.mime_type = mime_type
+        self.extension = extension
+        # Seconds spent waiting for the page to settle before the screenshot was taken.
+        self.settle_time = settle_time
+
+    @property
+    def observed(self):
+        return self.screenshot is not None or self.accessibility is not None
+
+class AsyncPlaywrightComputer:
     def __init__(
             self,
             screen_size: tuple[int, int],
             initial_url: str = "https://www.google.com",
             search_engine_url: str = "https://www.google.com",
-            context_state_path: str = None
+            context_state_path: str = None,
+            browser: Browser = None,
+            settle_policy: SettlePolicy = None,
+            screenshot_encoding: ScreenshotEncoding = None,
+            frame_cache: FrameCache = None,
+            pool: "BrowserPool" = None,
+            headless: bool = False,
+            routing: RoutingPolicy = None,
+            bulk_text_entry: bool = True,
+            max_background_tabs: int = 1,
+            observation_backend: str = "screenshot",
+            observation_mode: str = "screenshot"
     ):
+        if observation_backend not in ("screenshot", "screencast"):
+            raise ValueError(f"Unsupported observation backend: {observation_backend}")
+        if observation_mode not in ("screenshot", "accessibility", "hybrid"):
+            raise ValueError(f"Unsupported observation mode: {observation_mode}")
         self._screen_size = screen_size
         self._initial_url = initial_url
         self._search_engine_url = search_engine_url
         self._context_state_path = context_state_path
-        self._initialize()
-
-
-    def _initialize(self):
-        self._playwright = sync_playwright().start()
-        self._browser = self._playwright.chromium.launch(
-            args=[
-                "--disable-extensions",
-                "--disable-file-system",
-                "--disable-plugins",
-                "--disable-dev-shm-usage",
-                "--disable-background-networking",
-                "--disable-default-apps",
-                "--disable-sync",
-            ],
-            headless=False
-        )
-
-        self._context = self._browser.new_context(
-            storage_state=self._context_state_path,
-            viewport={
-                "width": self._screen_size[0],
-                "height": self._screen_size[1]
-            }
-        )
-
-        self._page = self._context.new_page()
-        self._page.goto(self._initial_url)
+        # When a browser or a pool is passed in (e.g. by the batch runner), this computer only owns its context.
+        # A pooled context comes pre-authenticated and already on the pool's initial URL.
+        self._pool = pool
+        if pool is not None:
+            self._initial_url = pool.initial_url
+        self._lease = None
+        self._browser = browser
+        self._owns_browser = browser is None and pool is None
+        self._headless = headless
+        # Pooled contexts use the pool's routing policy instead.
+        self._routing = routing
+        self._playwright = None
+        self._context = None
+        self._page = None
+        # Pages that opened the active one, most recent last. go_back returns to them.
+        self._background_pages = []
+        self._max_background_tabs = max_background_tabs
+        self._started = False
+        # Replaced by the agent's tracer so browser and model spans end up in one trace.
+        self.tracer = Tracer()
+        self._settler = PageSettler(settle_policy)
+        self._screenshot_encoding = screenshot_encoding or ScreenshotEncoding()
+        # "screenshot" observes the page as an image, "accessibility" as a text snapshot of the viewport,
+        # "hybrid" as both, with the screenshot downscaled since the text carries the details.
+        self._observation_mode = observation_mode
+        self._accessibility = AccessibilityTracker() if observation_mode != "screenshot" else None
+        if observation_mode == "hybrid" and self._screenshot_encoding.max_width is None:
+            self._screenshot_encoding = ScreenshotEncoding(
+                self._screenshot_encoding.image_format,
+                self._screenshot_encoding.quality,
+                HYBRID_SCREENSHOT_MAX_WIDTH
+            )
+        # Only set when unchanged frames should be deduplicated.
+        self._frame_cache = frame_cache
+        # Enter text in one step where the field allows it, instead of one key event per character.
+        self._bulk_text_entry = bulk_text_entry
+        # "screencast" observes the latest frame pushed by Chromium, "screenshot" captures one per observation.
+        # Screenshots remain the fallback whenever a page has no frame yet.
+        self._observation_backend = observation_backend
+        self._screencasts: dict[Page, ScreencastRecorder] = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        if self._pool is not None:
+            self._lease = await self._pool.acquire()
+            self._context, self._page = self._lease.context, self._lease.page
+            self._track_page(self._page)
+            self._context.on("page", self._handle_new_page)
+            await self._start_screencast(self._page)
+            self._started = True
+            return
+
+        if self._owns_browser:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                args=PLAYWRIGHT_BROWSER_ARGS,
+                headless=self._headless
+            )
+
+        self._context = await new_agent_context(self._browser, self._screen_size, self._context_state_path, self._routing)
+
+        self._page = await self._context.new_page()
+        self._track_page(self._page)
+        await self._page.goto(self._initial_url)
         self._context.on("page", self._handle_new_page)
-
-
-    def _handle_new_page(self, new_page: Page):
+        await self._start_screencast(self._page)
+        self._started = True
+
+    async def close(self):
+        if not self._started:
+            return
+        self._started = False
+        if self._lease is not None:
+            self._context.remove_listener("page", self._handle_new_page)
+            for recorder in self._screencasts.values():
+                await recorder.stop()
+            self._screencasts.clear()
+            await self._pool.release(self._lease)
+            self._lease = None
+            return
+        await self._context.close()
+        if self._owns_browser:
+            await self._browser.close()
+            await self._playwright.stop()
+
+    def _track_page(self, page: Page):
+        self._settler.attach(page)
+        page.on("close", self._handle_page_closed)
+
+    async def _start_screencast(self, page: Page):
+        if self._observation_backend != "screencast" or page in self._screencasts:
+            return
+        recorder = ScreencastRecorder(page, self._screenshot_encoding)
+        try:
+            await recorder.start()
+        except PlaywrightError as e:
+            print(f"Screencast unavailable, falling back to screenshots: {e}")
+            self._observation_backend = "screenshot"
+            return
+        self._screencasts[page] = recorder
+
+    async def _handle_new_page(self, new_page: Page):
         """The Computer Use model only supports a single tab at the moment.
 
         Some websites, however, try to open links in a new tab.
-        For those situations, we intercept the page-opening behavior, and instead overwrite the current page.
+        The new tab becomes the active page as it is, so the load it already started is reused instead of
+        navigating again. The page that opened it is kept as a background tab (up to max_background_tabs).
         """
-        new_url = new_page.url
-        new_page.close()
-        self._page.goto(new_url)
-
-    def current_state(self):
-        self._page.wait_for_load_state()
-        # Even if Playwright reports the page as loaded, it may not be so.
-        # Add a manual sleep to make sure the page has finished rendering.
-        time.sleep(0.5)
-        screenshot_bytes = self._page.screenshot(type="png", full_page=False)
-        return EnvState(screenshot=screenshot_bytes, url=self._page.url)
+        # Switch before the first await, so an action that is still running observes the new tab.
+        opener = self._page
+        self._page = new_page
+        self._track_page(new_page)
+        self._background_pages.append(opener)
+        await self._start_screencast(new_page)
+        while len(self._background_pages) > self._max_background_tabs:
+            await self._background_pages.pop(0).close()
+
+    def _handle_page_closed(self, page: Page):
+        self._screencasts.pop(page, None)
+        # A tab that closes itself (e.g. a login popup) hands control back to the page that opened it.
+        if page is self._page and self._background_pages:
+            self._page = self._background_pages.pop()
+        elif page in self._background_pages:
+            self._background_pages.remove(page)
+
+    @property
+    def started(self):
+        return self._started
+
+    def reset_accessibility(self):
+        """Make the next observation a full accessibility snapshot instead of a diff."""
+        if self._accessibility is not None:
+            self._accessibility.reset()
+
+    async def save_storage_state(self, path: str):
+        """Write the cookies and local storage of the context, in the format context_state_path loads."""
+        await self._context.storage_state(path=path)
+
+    @property
+    def settle_history(self):
+        return self._settler.history
+
+    @property
+    def frame_cache(self):
+        return self._frame_cache
+
+    @property
+    def url(self):
+        return self._page.url
+
+    @property
+    def initial_url(self):
+        return self._initial_url
+
+    async def current_state(self, observe: bool = True):
+        """Wait for the page to settle and observe it.
+
+        With observe=False only the URL is returned: the screenshot is skipped for intermediate actions
+        whose resulting screen the model never looks at. In the accessibility mode no screenshot is taken.
+        """
+        # Even if Playwright reports the page as loaded, it may still be rendering or fetching data.
+        # Wait until network, DOM (and optionally frames) are quiet, bounded by the settle policy.
+        settle_started = asyncio.get_running_loop().time()
+        with self.tracer.span("settle") as span:
+            page = self._page
+            await self._start_screencast(page)
+            settle = await self._settler.settle(page, self._screencasts.get(page))
+            if self._page is not page:
+                # A new tab was adopted while waiting, so wait for that one instead.
+                settle = await self._settler.settle(self._page, self._screencasts.get(self._page))
+            span.set(timed_out=settle.timed_out)
+        if not observe:
+            return EnvState(screenshot=None, url=self._page.url, settle_time=settle.duration)
+        accessibility = None
+        if self._accessibility is not None:
+            with self.tracer.span("accessibility") as span:
+                accessibility = await self._accessibility.observe(self._page)
+                span.set(chars=len(accessibility))
+            if self._observation_mode == "accessibility":
+                return EnvState(screenshot=None, url=self._page.url, settle_time=settle.duration, accessibility=accessibility)
+        with self.tracer.span("screenshot") as span:
+            screenshot_bytes = None
+            recorder = self._screencasts.get(self._page)
+            if recorder is not None:
+                # A frame from before the settle may still show the screen from before the action.
+                screenshot_bytes = await recorder.encoded_frame(since=settle_started)
+            span.set(source="screenshot" if screenshot_bytes is None else "screencast")
+            if screenshot_bytes is None:
+                screenshot_bytes = await capture_screenshot(self._page, self._screenshot_encoding, png_frame=settle.frame)
+            span.set(bytes=len(screenshot_bytes), format=self._screenshot_encoding.image_format)
+        with self.tracer.span("frame_hash") as span:
+            if self._frame_cache is not None:
+                frame_hash, unchanged = await asyncio.to_thread(self._frame_cache.observe, screenshot_bytes)
+            else:
+                frame_hash = await asyncio.to_thread(compute_frame_hash, screenshot_bytes)
+                unchanged = False
+            span.set(unchanged=unchanged)
+        return EnvState(
+            screenshot=screenshot_bytes,
+            url=self._page.url,
+            settle_time=settle.duration,
+            mime_type=self._screenshot_encoding.mime_type,
+            extension=self._screenshot_encoding.extension,
+            frame_hash=frame_hash,
+            unchanged=unchanged,
+            accessibility=accessibility
+        )
 
-    def open_browser(self):
-        return self.current_state()
+    @traced("action.open_browser")
+    async def open_browser(self, observe: bool = True):
+        return await self.current_state(observe)
 
     def screen_size(self):
         viewport_size = self._page.viewport_size
@@ -127,80 +391,121 @@ class PlaywrightComputer:
         # If unavailable, fall back to the original provided size.
         return self._screen_size
 
-    def go_back(self):
-        self._page.go_back()
-        self._page.wait_for_load_state()
-        return self.current_state()
-
-    def go_forward(self):
-        self._page.go_forward()
-        self._page.wait_for_load_state()
-        return self.current_state()
-
-    def search(self):
-        return self.navigate(self._search_engine_url)
-
-    def navigate(self, url: str):
+    @traced("action.go_back")
+    async def go_back(self, observe: bool = True):
+        response = await self._page.go_back()
+        if response is None and self._background_pages and await self._page.evaluate("history.length") <= 1:
+            # The tab has no history of its own: going back means returning to the tab that opened it.
+            page = self._page
+            self._page = self._background_pages.pop()
+            await page.close()
+            await self._page.bring_to_front()
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+    @traced("action.go_forward")
+    async def go_forward(self, observe: bool = True):
+        await self._page.go_forward()
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+    @traced("action.search")
+    async def search(self, observe: bool = True):
+        return await self.navigate(self._search_engine_url, observe)
+
+    @traced("action.navigate")
+    async def navigate(self, url: str, observe: bool = True):
         normalized_url = url
         if not normalized_url.startswith(("http://", "https://")):
             normalized_url = "https://" + normalized_url
-        self._page.goto(normalized_url)
-        self._page.wait_for_load_state()
-        return self.current_state()
-
-    def click_at(self, x: int, y: int):
-        self._page.mouse.click(x, y)
-        self._page.wait_for_load_state()
-        return self.current_state()
-
-
-    def hover_at(self, x: int, y: int):
-        self._page.mouse.move(x, y)
-        self._page.wait_for_load_state()
-        return self.current_state()
-
-    def type_text_at(self, x: int, y: int, text: str, press_enter: bool = True, clear_before_typing: bool = True):
-        self._page.mouse.click(x, y)
-        self._page.wait_for_load_state()
-
-        if clear_before_typing:
-            self.key_combination(["Control", "A"])
-            self.key_combination(["Delete"])
-
-        self._page.keyboard.type(text)
-        self._page.wait_for_load_state()
+        await self._page.goto(normalized_url)
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+    @traced("action.click_at")
+    async def click_at(self, x: int, y: int, observe: bool = True):
+        await self._page.mouse.click(x, y)
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+
+    @traced("action.hover_at")
+    async def hover_at(self, x: int, y: int, observe: bool = True):
+        await self._page.mouse.move(x, y)
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+    @traced("action.type_text_at")
+    async def type_text_at(self, x: int, y: int, text: str, press_enter: bool = True, clear_before_typing: bool = True, observe: bool = True):
+        await self._page.mouse.click(x, y)
+        await self._page.wait_for_load_state()
+
+        # Intermediate key presses are not observed: only the final state is reported to the model,
+        # which also keeps the frame cache comparing against frames the model has actually seen.
+        if not (self._bulk_text_entry and await self._enter_text(text, clear_before_typing)):
+            if clear_before_typing:
+                await self._press_keys(["Control", "A"])
+                await self._press_keys(["Delete"])
+            await self._page.keyboard.type(text)
+        await self._page.wait_for_load_state()
 
         if press_enter:
-            self.key_combination(["Enter"])
-        self._page.wait_for_load_state()
-        return self.current_state()
-
+            await self._press_keys(["Enter"])
+        await self._page.wait_for_load_state()
+        return await self.current_state(observe)
+
+    async def _enter_text(self, text: str, clear_before_typing: bool) -> bool:
+        """Put text into the focused field at once: fill() replaces the value of inputs and textareas,
+        insert_text() inserts at the cursor with a single input event. Returns False when the focused element
+        is not a plain text field (e.g. a canvas editor or an iframe), so the caller types key by key instead."""
+        target = await self._page.evaluate(FOCUSED_TEXT_TARGET_SCRIPT)
+        if target == "none":
+            return False
+        if target == "fillable" and clear_before_typing:
+            handle = await self._page.evaluate_handle("document.activeElement")
+            try:
+                await handle.as_element().fill(text)
+                return True
+            except PlaywrightError:
+                # e.g. non-numeric text in a number input.
+                return False
+            finally:
+                await handle.dispose()
+        if clear_before_typing:
+            await self._press_keys(["Control", "A"])
+            await self._press_keys(["Delete"])
+        await self._page.keyboard.insert_text(text)
+        return True
 
-    def key_combination(self, keys: list[str]):
+    async def _press_keys(self, keys: list[str]):
         keys = [PLAYWRIGHT_KEY_MAP.get(k.lower(), k) for k in keys]
 
         for key in keys[:-1]:
-            self._page.keyboard.down(key)
+            await self._page.keyboard.down(key)
 
-        self._page.keyboard.press(keys[-1])
+        await self._page.keyboard.press(keys[-1])
 
         for key in reversed(keys[:-1]):
-            self._page.keyboard.up(key)
+            await self._page.keyboard.up(key)
 
-        return self.current_state()
+    @traced("action.key_combination")
+    async def key_combination(self, keys: list[str], observe: bool = True):
+        await self._press_keys(keys)
+        return await self.current_state(observe)
 
-    def scroll_document(self, direction: Literal["up", "down", "left", "right"]):
+    @traced("action.scroll_document")
+    async def scroll_document(self, direction: Literal["up", "down", "left", "right"], observe: bool = True):
         if direction == "down":
-            return self.key_combination(["PageDown"])
+            return await self.key_combination(["PageDown"], observe)
         elif direction == "up":
-            return self.key_combination(["PageUp"])
+            return await self.key_combination(["PageUp"], observe)
         elif direction in ("left", "right"):
-            return self._horizontal_document_scroll(direction)
+            return await self._horizontal_document_scroll(direction, observe)
         else:
             raise ValueError("Unsupported direction: ", direction)
 
-    def _horizontal_document_scroll(
-            self, direction: Literal["left", "right"]
+    async def _horizontal_document_scroll(
+            self, direction: Literal["left", "right"], observe: bool = True
     ) -> EnvState:
         # Scroll by 50% of the viewport size.
         horizontal_scroll_amount = self.screen_size()[0] // 2
@@ -210,18 +515,20 @@ class PlaywrightComputer:
             sign = ""
         scroll_argument = f"{sign}{horizontal_scroll_amount}"
         # Scroll using JS.
-        self._page.evaluate(f"window.scrollBy({scroll_argument}, 0); ")
-        return self.current_state()
+        await self._page.evaluate(f"window.scrollBy({scroll_argument}, 0); ")
+        return await self.current_state(observe)
 
-    def scroll_at(
+    @traced("action.scroll_at")
+    async def scroll_at(
             self,
             x: int,
             y: int,
             direction: Literal["up", "down", "left", "right"],
             magnitude: int = 800,
+            observe: bool = True
     ):
-        self._page.mouse.move(x, y)
-        self._page.wait_for_load_state()
+        await self._page.mouse.move(x, y)
+        await self._page.wait_for_load_state()
 
         dx = 0
         dy = 0
@@ -236,13 +543,115 @@ class PlaywrightComputer:
         else:
             raise ValueError("Unsupported direction: ", direction)
 
-        self._page.mouse.wheel(dx, dy)
-        return self.current_state()
+        await self._page.mouse.wheel(dx, dy)
+        return await self.current_state(observe)
+
+
+class PlaywrightComputer:
+    """Blocking facade that drives an AsyncPlaywrightComputer on a private event loop."""
+
+    def __init__(
+            self,
+            screen_size: tuple[int, int],
+            initial_url: str = "https://www.google.com",
+            search_engine_url: str = "https://www.google.com",
+            context_state_path: str = None,
+            loop: asyncio.AbstractEventLoop = None,
+            launch: bool = True,
+            **kwargs
+    ):
+        self._owns_loop = loop is None
+        self.loop = loop or asyncio.new_event_loop()
+        self.async_computer = AsyncPlaywrightComputer(
+            screen_size,
+            initial_url=initial_url,
+            search_engine_url=search_engine_url,
+            context_state_path=context_state_path,
+            **kwargs
+        )
+        # With launch=False the browser is started later by start() or by the agent, which overlaps it with planning.
+        if launch:
+            self.start()
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def start(self):
+        self._run(self.async_computer.start())
+
+    @property
+    def started(self):
+        return self.async_computer.started
+
+    def reset_accessibility(self):
+        self.async_computer.reset_accessibility()
+
+    def save_storage_state(self, path: str):
+        return self._run(self.async_computer.save_storage_state(path))
+
+    def close(self):
+        self._run(self.async_computer.close())
+        if self._owns_loop:
+            self.loop.close()
+
+    def current_state(self, observe: bool = True):
+        return self._run(self.async_computer.current_state(observe))
 
+    def open_browser(self, observe: bool = True):
+        return self._run(self.async_computer.open_browser(observe))
 
+    def screen_size(self):
+        return self.async_computer.screen_size()
+
+    @property
+    def settle_history(self):
+        return self.async_computer.settle_history
+
+    @property
+    def frame_cache(self):
+        return self.async_computer.frame_cache
+
+    @property
+    def url(self):
+        return self.async_computer.url
+
+    @property
+    def initial_url(self):
+        return self.async_computer.initial_url
+
+    def go_back(self, observe: bool = True):
+        return self._run(self.async_computer.go_back(observe))
+
+    def go_forward(self, observe: bool = True):
+        return self._run(self.async_computer.go_forward(observe))
+
+    def search(self, observe: bool = True):
+        return self._run(self.async_computer.search(observe))
 
+    def navigate(self, url: str, observe: bool = True):
+        return self._run(self.async_computer.navigate(url, observe))
 
+    def click_at(self, x: int, y: int, observe: bool = True):
+        return self._run(self.async_computer.click_at(x, y, observe))
 
+    def hover_at(self, x: int, y: int, observe: bool = True):
+        return self._run(self.async_computer.hover_at(x, y, observe))
 
+    def type_text_at(self, x: int, y: int, text: str, press_enter: bool = True, clear_before_typing: bool = True, observe: bool = True):
+        return self._run(self.async_computer.type_text_at(x, y, text, press_enter, clear_before_typing, observe))
 
+    def key_combination(self, keys: list[str], observe: bool = True):
+        return self._run(self.async_computer.key_combination(keys, observe))
 
+    def scroll_document(self, direction: Literal["up", "down", "left", "right"], observe: bool = True):
+        return self._run(self.async_computer.scroll_document(direction, observe))
+
+    def scroll_at(
+            self,
+            x: int,
+            y: int,
+            direction: Literal["up", "down", "left", "right"],
+            magnitude: int = 800,
+            observe: bool = True
+    ):
+        return self._run(self.async_computer.scroll_at(x, y, direction, magnitude, observe))
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+from urllib.parse import urlparse
+from playwright.async_api import BrowserContext, Route, Error as PlaywrightError
+
+# Analytics, ads and session-recording hosts that never matter to the agent.
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "intercom.io",
+    "fullstory.com",
+    "sentry.io",
+    "datadoghq.com",
+    "clarity.ms",
+)
+
+CACHEABLE_RESOURCE_TYPES = ("stylesheet", "script", "image", "font")
+
+
+class RoutingPolicy:
+    """Request interception applied to every agent context.
+
+    blocked_resource_types: Playwright resource types to abort, e.g. ("media", "font").
+    blocked_domains: hosts (and their subdomains) to abort.
+    cache_dir: on-disk cache for static assets (cache_resource_types), shared across runs and processes.
+    cache_ttl: seconds a cached asset stays valid.
+    har_path / har_mode: "record" captures all traffic of the context into a HAR file when it closes,
+        "replay" serves requests from that file so a task can run fully offline.
+    """
+
+    def __init__(
+            self,
+            blocked_resource_types: tuple[str, ...] = (),
+            blocked_domains: tuple[str, ...] = (),
+            cache_dir: str = None,
+            cache_resource_types: tuple[str, ...] = CACHEABLE_RESOURCE_TYPES,
+            cache_ttl: float = 24 * 3600,
+            har_path: str = None,
+            har_mode: str = None
+    ):
+        if har_mode not in (None, "record", "replay"):
+            raise ValueError(f"Unsupported HAR mode: {har_mode}")
+        if har_mode and not har_path:
+            raise ValueError("har_path is required when har_mode is set.")
+        if har_mode == "record" and cache_dir:
+            # Assets served from the cache never reach the HAR route, so a replay of the recording would lack them.
+            raise ValueError("cache_dir cannot be used while recording a HAR.")
+        self.blocked_resource_types = set(blocked_resource_types)
+        self.blocked_domains = tuple(d.lower().lstrip(".") for d in blocked_domains)
+        self.cache_dir = cache_dir
+        self.cache_resource_types = set(cache_resource_types)
+        self.cache_ttl = cache_ttl
+        self.har_path = har_path
+        self.har_mode = har_mode
+        self.blocked = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def stats(self) -> dict:
+        return {"blocked": self.blocked, "cache_hits": self.cache_hits, "cache_misses": self.cache_misses}
+
+    def is_blocked(self, url: str, resource_type: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+    def _cache_paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".body", base + ".json"
+
+    def _read_cache(self, url: str):
+        body_path, meta_path = self._cache_paths(url)
+        try:
+            if time.time() - os.path.getmtime(meta_path) > self.cache_ttl:
+                return None
+            with open(meta_path, "r") as fp:
+                meta = json.load(fp)
+            with open(body_path, "rb") as fp:
+                return meta, fp.read()
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, url: str, status: int, headers: dict, body: bytes):
+        body_path, meta_path = self._cache_paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        # Body first, metadata last: a reader only trusts an entry once its metadata exists.
+        for path, data in ((body_path, body), (meta_path, json.dumps({"status": status, "headers": headers}).encode("utf-8"))):
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    fp.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def _should_cache(self, route: Route) -> bool:
+        request = route.request
+        return (
+            self.cache_dir is not None
+            and self.har_mode != "replay"
+            and request.method == "GET"
+            and request.resource_type in self.cache_resource_types
+            and request.url.startswith(("http://", "https://"))
+        )
+
+    async def handle(self, route: Route):
+        request = route.request
+        if self.is_blocked(request.url, request.resource_type):
+            self.blocked += 1
+            await route.abort()
+            return
+        if not self._should_cache(route):
+            # Let the HAR route (if any) or the network handle it.
+            await route.fallback()
+            return
+
+        cached = await asyncio.to_thread(self._read_cache, request.url)
+        if cached is not None:
+            self.cache_hits += 1
+            meta, body = cached
+            await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+            return
+
+        self.cache_misses += 1
+        try:
+            response = await route.fetch()
+        except PlaywrightError:
+            # Connection reset, DNS failure, timeout: let the browser make the request itself, so the page
+            # sees the network error instead of a route that is never resolved.
+            await route.fallback()
+            return
+        cache_control = response.headers.get("cache-control", "")
+        if response.status == 200 and "no-store" not in cache_control:
+            try:
+                body = await response.body()
+                # The body is stored decoded, so drop headers that describe the wire encoding.
+                headers = {
+                    k: v for k, v in response.headers.items()
+                    if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+                }
+                await asyncio.to_thread(self._write_cache, request.url, response.status, headers, body)
+            except (PlaywrightError, OSError) as e:
+                print(f"Failed to cache {request.url}: {e}")
+        await route.fulfill(response=response)
+
+
+def make_routing_policy(
+        block_resource_types: str = None,
+        block_trackers: bool = False,
+        cache_dir: str = None,
+        har_path: str = None,
+        har_mode: str = None
+):
+    """Build a policy from command-line style options, or None when no routing is requested."""
+    if not (block_resource_types or block_trackers or cache_dir or har_mode):
+        return None
+    return RoutingPolicy(
+        blocked_resource_types=tuple(t.strip() for t in (block_resource_types or "").split(",") if t.strip()),
+        blocked_domains=DEFAULT_BLOCKED_DOMAINS if block_trackers else (),
+        cache_dir=cache_dir,
+        har_path=har_path,
+        har_mode=har_mode
+    )
+
+
+async def install_routing(context: BrowserContext, policy: RoutingPolicy):
+    if policy.har_mode == "replay":
+        await context.route_from_har(policy.har_path, not_found="abort")
+    elif policy.har_mode == "record":
+        # update=True records every request of the context into the HAR, written when the context closes.
+        await context.route_from_har(policy.har_path, update=True, update_content="embed")
+    if policy.blocked_resource_types or policy.blocked_domains or policy.cache_dir:
+        # Registered last so it runs first; everything it does not handle falls back to the HAR route.
+        await context.route("**/*", policy.handle)
@@ -0,0 +1,82 @@
+import base64
+import asyncio
+from collections import deque
+from playwright.async_api import Page, Error as PlaywrightError
+
+from computers.encoding import ScreenshotEncoding, encode_image
+
+
+class ScreencastFrame:
+    def __init__(self, data: bytes, received_at: float):
+        self.data = data
+        self.received_at = received_at
+
+
+class ScreencastRecorder:
+    """Subscribes to the Chrome DevTools screencast of a page and keeps its most recent frames.
+
+    Chromium pushes a frame every time the page repaints, so the latest frame is the current screen and
+    observing it costs no capture round-trip. The time since the last frame also tells whether the page is
+    still changing, which the settle check uses instead of comparing screenshots. Frames are produced in the
+    requested format and size by Chromium itself; only WebP needs a re-encode.
+    """
+
+    def __init__(self, page: Page, encoding: ScreenshotEncoding, buffer_size: int = 4):
+        self._page = page
+        self._encoding = encoding
+        self._format = "jpeg" if encoding.image_format == "jpeg" else "png"
+        self.frames = deque(maxlen=buffer_size)
+        self._session = None
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._session = await self._page.context.new_cdp_session(self._page)
+        self._session.on("Page.screencastFrame", self._on_frame)
+        params = {"format": self._format, "everyNthFrame": 1}
+        if self._format == "jpeg":
+            params["quality"] = self._encoding.quality
+        viewport = self._page.viewport_size
+        if viewport:
+            width = min(viewport["width"], self._encoding.max_width or viewport["width"])
+            params["maxWidth"] = width
+            params["maxHeight"] = round(viewport["height"] * width / viewport["width"])
+        await self._session.send("Page.startScreencast", params)
+
+    async def stop(self):
+        try:
+            await self._session.send("Page.stopScreencast")
+            await self._session.detach()
+        except PlaywrightError:
+            # The page is already gone.
+            pass
+
+    def _on_frame(self, params: dict):
+        self.frames.append(ScreencastFrame(base64.b64decode(params["data"]), self._loop.time()))
+        # Chromium sends the next frame only after this one is acknowledged.
+        asyncio.ensure_future(self._ack(params["sessionId"]))
+
+    async def _ack(self, session_id: int):
+        try:
+            await self._session.send("Page.screencastFrameAck", {"sessionId": session_id})
+        except PlaywrightError:
+            pass
+
+    @property
+    def latest(self):
+        return self.frames[-1] if self.frames else None
+
+    def idle_time(self) -> float:
+        """Seconds since the page last repainted."""
+        if not self.frames:
+            return float("inf")
+        return self._loop.time() - self.frames[-1].received_at
+
+    async def encoded_frame(self, since: float = None):
+        """The latest frame in the observation encoding, or None if no frame has arrived (since `since`, in loop time)."""
+        frame = self.latest
+        if frame is None or (since is not None and frame.received_at < since):
+            return None
+        if self._encoding.image_format == self._format:
+            return frame.data
+        return await asyncio.to_thread(encode_image, frame.data, self._encoding)
@@ -0,0 +1,154 @@
+import asyncio
+from typing import TYPE_CHECKING
+from playwright.async_api import Error as PlaywrightError, Page, Request
+
+if TYPE_CHECKING:
+    from computers.screencast import ScreencastRecorder
+
+# Installed as an init script so every document records when its DOM last changed.
+DOM_MUTATION_TRACKER_SCRIPT = """
+(() => {
+    if (window.__webAgentSettle) {
+        return;
+    }
+    const state = { lastMutation: performance.now() };
+    window.__webAgentSettle = state;
+    new MutationObserver(() => {
+        state.lastMutation = performance.now();
+    }).observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+})();
+"""
+
+DOM_IDLE_MS_SCRIPT = "() => window.__webAgentSettle ? performance.now() - window.__webAgentSettle.lastMutation : null"
+
+# Long-lived connections never finish and must not keep the page "busy" forever.
+IGNORED_RESOURCE_TYPES = ("websocket", "eventsource")
+
+
+class SettlePolicy:
+    """Signals and bounds used to decide that a page has stopped changing.
+
+    timeout: upper bound in seconds for a single settle, after which the page is observed as-is.
+    min_wait: time to wait before the first check, so work kicked off by the action has started.
+    quiet_window: how long (seconds) the DOM must go without mutations.
+    poll_interval: delay between checks.
+    long_request_threshold: requests pending longer than this (seconds) are treated as background traffic.
+    network_idle / dom_idle / frame_stable: which signals must be quiet. frame_stable compares two consecutive
+        screenshots and is the most expensive, so it is off by default. With a screencast it only checks that
+        no frame arrived during quiet_window, which costs nothing.
+    """
+
+    def __init__(
+            self,
+            timeout: float = 5.0,
+            min_wait: float = 0.05,
+            quiet_window: float = 0.15,
+            poll_interval: float = 0.05,
+            long_request_threshold: float = 2.0,
+            network_idle: bool = True,
+            dom_idle: bool = True,
+            frame_stable: bool = False
+    ):
+        self.timeout = timeout
+        self.min_wait = min_wait
+        self.quiet_window = quiet_window
+        self.poll_interval = poll_interval
+        self.long_request_threshold = long_request_threshold
+        self.network_idle = network_idle
+        self.dom_idle = dom_idle
+        self.frame_stable = frame_stable
+
+
+class SettleResult:
+    def __init__(self, duration: float, timed_out: bool, frame: bytes = None):
+        self.duration = duration
+        self.timed_out = timed_out
+        # Last screenshot taken by the frame_stable check, reusable as the observation.
+        self.frame = frame
+
+
+class PageSettler:
+    """Waits until a page is quiet instead of sleeping for a fixed time, and records how long each wait took."""
+
+    def __init__(self, policy: SettlePolicy = None):
+        self.policy = policy or SettlePolicy()
+        self.history: list[SettleResult] = []
+        self._inflight: dict[Page, dict[Request, float]] = {}
+
+    def attach(self, page: Page):
+        if page in self._inflight:
+            return
+        inflight = {}
+        self._inflight[page] = inflight
+        loop = asyncio.get_running_loop()
+
+        def on_request(request: Request):
+            if request.resource_type not in IGNORED_RESOURCE_TYPES:
+                inflight[request] = loop.time()
+
+        def on_request_done(request: Request):
+            inflight.pop(request, None)
+
+        page.on("request", on_request)
+        page.on("requestfinished", on_request_done)
+        page.on("requestfailed", on_request_done)
+        page.on("close", lambda _: self._inflight.pop(page, None))
+
+    def _pending_requests(self, page: Page, now: float) -> int:
+        inflight = self._inflight.get(page, {})
+        return sum(1 for started in inflight.values() if now - started < self.policy.long_request_threshold)
+
+    async def _dom_idle_ms(self, page: Page):
+        try:
+            return await page.evaluate(DOM_IDLE_MS_SCRIPT)
+        except PlaywrightError:
+            # The execution context was destroyed by a navigation, so the page is not settled yet.
+            return 0
+
+    async def settle(self, page: Page, screencast: "ScreencastRecorder" = None) -> SettleResult:
+        policy = self.policy
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + policy.timeout
+
+        try:
+            await page.wait_for_load_state(timeout=policy.timeout * 1000)
+        except PlaywrightError:
+            pass
+        await asyncio.sleep(policy.min_wait)
+
+        timed_out = False
+        previous_frame = None
+        frame = None
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                timed_out = True
+                break
+
+            quiet = True
+            if policy.network_idle and self._pending_requests(page, now) > 0:
+                quiet = False
+            if quiet and policy.dom_idle:
+                idle_ms = await self._dom_idle_ms(page)
+                if idle_ms is not None and idle_ms < policy.quiet_window * 1000:
+                    quiet = False
+            if quiet and policy.frame_stable and screencast is not None and screencast.latest is not None:
+                if screencast.idle_time() < policy.quiet_window:
+                    quiet = False
+            elif quiet and policy.frame_stable:
+                frame = await page.screenshot(type="png", full_page=False)
+                if frame != previous_frame:
+                    previous_frame = frame
+                    quiet = False
+            if quiet:
+                break
+            await asyncio.sleep(policy.poll_interval)
+
+        result = SettleResult(
+            duration=loop.time() - start,
+            timed_out=timed_out,
+            frame=frame if policy.frame_stable and not timed_out else None
+        )
+        self.history.append(result)
+        return result
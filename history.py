@@ -0,0 +1,266 @@
+import io
+import json
+from collections import deque
+from PIL import Image
+
+from google.genai import types
+
+from computers.accessibility import DIFF_SNAPSHOT_HEADER, FULL_SNAPSHOT_HEADER, NO_CHANGE_NOTE
+from computers.frame_hash import estimate_image_tokens
+
+# Rough text tokenization ratio, good enough for budgeting.
+CHARS_PER_TOKEN = 4
+
+
+def _image_tokens(data: bytes) -> int:
+    try:
+        # Only the header is parsed here, the pixels are never decoded.
+        width, height = Image.open(io.BytesIO(data)).size
+    except Exception:
+        width, height = 1440, 900
+    return estimate_image_tokens(width, height)
+
+
+def _text_size(text: str) -> tuple[int, int]:
+    return len(text) // CHARS_PER_TOKEN + 1, len(text.encode("utf-8"))
+
+
+def estimate_content_size(content: types.Content) -> tuple[int, int, bool]:
+    """Return (estimated tokens, payload bytes, whether it carries images) for one Content."""
+    tokens, size, has_images = 0, 0, False
+    for part in content.parts or []:
+        if part.text:
+            t, b = _text_size(part.text)
+            tokens, size = tokens + t, size + b
+        if part.inline_data and part.inline_data.data:
+            # e.g. the screenshot of the start page attached to the first message.
+            has_images = True
+            tokens += _image_tokens(part.inline_data.data)
+            size += len(part.inline_data.data)
+        if part.function_call:
+            t, b = _text_size(part.function_call.name + json.dumps(part.function_call.args or {}, default=str))
+            tokens, size = tokens + t, size + b
+        if part.function_response:
+            response = part.function_response
+            t, b = _text_size((response.name or "") + json.dumps(response.response or {}, default=str))
+            tokens, size = tokens + t, size + b
+            for response_part in response.parts or []:
+                if response_part.inline_data and response_part.inline_data.data:
+                    has_images = True
+                    tokens += _image_tokens(response_part.inline_data.data)
+                    size += len(response_part.inline_data.data)
+    return tokens, size, has_images
+
+
+def _is_snapshot(text) -> bool:
+    return isinstance(text, str) and text.startswith((FULL_SNAPSHOT_HEADER, DIFF_SNAPSHOT_HEADER, NO_CHANGE_NOTE))
+
+
+def _snapshots(content: types.Content) -> list[str]:
+    """Accessibility snapshots (full, diffs and no-change notes) carried by one Content."""
+    snapshots = []
+    for part in content.parts or []:
+        if _is_snapshot(part.text):
+            snapshots.append(part.text)
+        if part.function_response and _is_snapshot((part.function_response.response or {}).get("accessibility_snapshot")):
+            snapshots.append(part.function_response.response["accessibility_snapshot"])
+    return snapshots
+
+
+class _Entry:
+    __slots__ = ("content", "tokens", "bytes", "has_images", "snapshots", "full_snapshots", "evicted")
+
+    def __init__(self, content: types.Content):
+        self.content = content
+        self.tokens, self.bytes, self.has_images = estimate_content_size(content)
+        snapshots = _snapshots(content)
+        self.snapshots = len(snapshots)
+        self.full_snapshots = sum(1 for snapshot in snapshots if snapshot.startswith(FULL_SNAPSHOT_HEADER))
+        self.evicted = False
+
+    @property
+    def has_observations(self):
+        return self.has_images or self.snapshots > 0
+
+
+class ConversationHistory:
+    """Conversation sent to the computer-use model, kept within a fixed size.
+
+    Appending and evicting are O(1): running totals are updated incrementally and the turns that still
+    carry screenshots are tracked in their own queue, so nothing walks the whole history per iteration.
+
+    The first message (the plan) is pinned. When max_tokens or max_bytes is exceeded, the oldest steps
+    are dropped and replaced by one-line summaries of the action and resulting URL, which are appended
+    to the pinned message. Only the max_turns_with_screenshots most recent turns keep their images and
+    accessibility snapshots. Snapshot diffs need a full snapshot to apply to, so when the last full one is
+    dropped snapshot_base_lost is set, and the caller should send a full snapshot next.
+    """
+
+    def __init__(
+            self,
+            max_turns_with_screenshots: int = 3,
+            max_tokens: int = None,
+            max_bytes: int = None,
+            min_recent_entries: int = 4,
+            max_summary_lines: int = 100
+    ):
+        self.max_turns_with_screenshots = max_turns_with_screenshots
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.min_recent_entries = min_recent_entries
+        self._pinned = None
+        self._entries = deque()
+        # Entries that still carry screenshots or accessibility snapshots, oldest first.
+        self._screenshot_entries = deque()
+        self._full_snapshots = 0
+        self.snapshot_base_lost = False
+        self._summary_lines = deque(maxlen=max_summary_lines)
+        self._summarized_steps = 0
+        self.total_tokens = 0
+        self.total_bytes = 0
+        # (estimated tokens, bytes) of every request built from this history.
+        self.request_sizes = []
+
+    def __len__(self):
+        return len(self._entries) + (1 if self._pinned is not None else 0)
+
+    def clear(self):
+        self._pinned = None
+        self._entries.clear()
+        self._screenshot_entries.clear()
+        self._full_snapshots = 0
+        self.snapshot_base_lost = False
+        self._summary_lines.clear()
+        self._summarized_steps = 0
+        self.total_tokens = 0
+        self.total_bytes = 0
+        self.request_sizes = []
+
+    def append(self, content: types.Content):
+        entry = _Entry(content)
+        if self._pinned is None:
+            self._pinned = entry
+        else:
+            self._entries.append(entry)
+        self.total_tokens += entry.tokens
+        self.total_bytes += entry.bytes
+        if entry.full_snapshots:
+            self._full_snapshots += entry.full_snapshots
+            self.snapshot_base_lost = False
+
+        if entry.has_observations:
+            self._screenshot_entries.append(entry)
+            while len(self._screenshot_entries) > self.max_turns_with_screenshots:
+                self._strip_observations(self._screenshot_entries.popleft())
+        self._enforce_budget()
+
+    def _drop_snapshots(self, entry: _Entry):
+        if entry.full_snapshots:
+            self._full_snapshots -= entry.full_snapshots
+            if self._full_snapshots == 0:
+                self.snapshot_base_lost = True
+        entry.snapshots = entry.full_snapshots = 0
+
+    def _strip_observations(self, entry: _Entry):
+        if entry.evicted:
+            # Its size is no longer part of the totals.
+            return
+        if entry.content.parts:
+            entry.content.parts = [part for part in entry.content.parts if not part.inline_data and not _is_snapshot(part.text)]
+        for part in entry.content.parts or []:
+            if part.function_response and part.function_response.parts and part.function_response.name:
+                part.function_response.parts = None
+            if part.function_response and "accessibility_snapshot" in (part.function_response.response or {}):
+                part.function_response.response = {
+                    k: v for k, v in part.function_response.response.items() if k != "accessibility_snapshot"
+                }
+        self._drop_snapshots(entry)
+        self.total_tokens -= entry.tokens
+        self.total_bytes -= entry.bytes
+        entry.tokens, entry.bytes, entry.has_images = estimate_content_size(entry.content)
+        self.total_tokens += entry.tokens
+        self.total_bytes += entry.bytes
+
+    def _over_budget(self) -> bool:
+        return (
+            (self.max_tokens is not None and self.total_tokens > self.max_tokens)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        )
+
+    def _enforce_budget(self):
+        while self._over_budget() and len(self._entries) > self.min_recent_entries:
+            self._evict_oldest_step()
+
+    def _pop_entry(self) -> _Entry:
+        entry = self._entries.popleft()
+        entry.evicted = True
+        self.total_tokens -= entry.tokens
+        self.total_bytes -= entry.bytes
+        if entry.has_observations:
+            self._drop_snapshots(entry)
+            # Not necessarily at the front: the pinned first message can hold an older screenshot.
+            # The queue holds at most max_turns_with_screenshots + 1 entries, so this stays cheap.
+            self._screenshot_entries.remove(entry)
+        return entry
+
+    def _evict_oldest_step(self):
+        entry = self._pop_entry()
+        content = entry.content
+        if content.role != "model":
+            self._add_summary_line(self._summarize_user_content(content))
+            return
+
+        # A model turn is evicted together with the function responses that answer it.
+        calls = [part.function_call for part in content.parts or [] if part.function_call]
+        urls = []
+        if calls and self._entries and self._entries[0].content.role == "user":
+            response_content = self._pop_entry().content
+            urls = [
+                (part.function_response.response or {}).get("url")
+                for part in response_content.parts or []
+                if part.function_response
+            ]
+        self._summarized_steps += 1
+        if not calls:
+            text = " ".join(part.text for part in content.parts or [] if part.text)
+            self._add_summary_line(f"Step {self._summarized_steps}: {text[:200]}")
+            return
+        actions = []
+        for idx, call in enumerate(calls):
+            args = ", ".join(f"{k}={v}" for k, v in (call.args or {}).items() if k != "safety_decision")
+            action = f"{call.name}({args})"
+            if idx < len(urls) and urls[idx]:
+                action += f" -> {urls[idx]}"
+            actions.append(action)
+        self._add_summary_line(f"Step {self._summarized_steps}: " + "; ".join(actions))
+
+    @staticmethod
+    def _summarize_user_content(content: types.Content) -> str:
+        text = " ".join(part.text for part in content.parts or [] if part.text)
+        return f"User: {text[:200]}"
+
+    def _add_summary_line(self, line: str):
+        t, b = _text_size(line)
+        if len(self._summary_lines) == self._summary_lines.maxlen:
+            old_t, old_b = _text_size(self._summary_lines[0])
+            self.total_tokens -= old_t
+            self.total_bytes -= old_b
+        self._summary_lines.append(line)
+        self.total_tokens += t
+        self.total_bytes += b
+
+    def contents(self) -> list[types.Content]:
+        """Build the request payload and record its size."""
+        contents = []
+        if self._pinned is not None:
+            if self._summary_lines:
+                summary = "Summary of earlier steps (screenshots no longer available):\n" + "\n".join(self._summary_lines)
+                contents.append(types.Content(
+                    role=self._pinned.content.role,
+                    parts=list(self._pinned.content.parts or []) + [types.Part(text=summary)]
+                ))
+            else:
+                contents.append(self._pinned.content)
+        contents.extend(entry.content for entry in self._entries)
+        self.request_sizes.append((self.total_tokens, self.total_bytes))
+        return contents
@@ -0,0 +1,95 @@
+import os
+import re
+import time
+import asyncio
+import hashlib
+import sqlite3
+
+DEFAULT_PLAN_CACHE_PATH = os.path.join("cache", "plan_cache.sqlite3")
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """On-disk cache of planner outputs, keyed on the normalized query, planner prompt and model.
+
+    Backed by SQLite, so several agents, worker coroutines or processes can share one file: every call
+    opens its own connection and writes are serialized by SQLite's locking. Entries expire after ttl
+    seconds, and once there are more than max_entries the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_PLAN_CACHE_PATH, ttl: float = 7 * 24 * 3600, max_entries: int = 1000):
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, plan TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS plans_last_access ON plans (last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=30)
+
+    @staticmethod
+    def make_key(query: str, prompt_hash: str, model: str) -> str:
+        return hash_text("\n".join((normalize_query(query), prompt_hash, model)))
+
+    def _get(self, key: str):
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute("SELECT plan, created_at FROM plans WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                plan, created_at = row
+                if now - created_at > self._ttl:
+                    connection.execute("DELETE FROM plans WHERE key = ?", (key,))
+                    return None
+                connection.execute("UPDATE plans SET last_access = ? WHERE key = ?", (now, key))
+                return plan
+        finally:
+            connection.close()
+
+    def _put(self, key: str, plan: str):
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO plans (key, plan, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, plan, now, now)
+                )
+                connection.execute("DELETE FROM plans WHERE created_at < ?", (now - self._ttl,))
+                connection.execute(
+                    "DELETE FROM plans WHERE key IN ("
+                    "SELECT key FROM plans ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,)
+                )
+        finally:
+            connection.close()
+
+    async def get(self, query: str, prompt_hash: str, model: str):
+        plan = await asyncio.to_thread(self._get, self.make_key(query, prompt_hash, model))
+        if plan is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return plan
+
+    async def put(self, query: str, prompt_hash: str, model: str, plan: str):
+        await asyncio.to_thread(self._put, self.make_key(query, prompt_hash, model), plan)
@@ -0,0 +1,107 @@
+import json
+from collections import deque
+
+LOOP_HINT = (
+    "You have repeated the same {length} action(s) {repeats} times and the page ended up in the same state each "
+    "time, so they are not working. Do something different, e.g. scroll to find the right element, use another "
+    "control, or go to the URL directly."
+)
+STALL_HINT = (
+    "The last {count} actions did not change the page. Check whether what you wanted has already happened, "
+    "and otherwise try a different approach instead of repeating it."
+)
+
+
+class RunAborted(Exception):
+    """Raised when a run is stopped because it ran out of turns or kept looping after being told so."""
+
+
+class ProgressMonitor:
+    """Watches the actions of a run for loops and stalls, and bounds its number of turns.
+
+    Each action is keyed by (function name, args, URL, screenshot hash after it). A loop is the same sequence of
+    up to max_cycle_length keys repeated max_repeats times in a row, e.g. clicking the same spot of an unchanged
+    page or scrolling a page that is already at the bottom. A stall is max_stalled observed actions in a row that
+    left the URL and screen as they were. Either gets a corrective hint sent along with the next function
+    responses, and once max_hints hints have not helped the run is aborted. So is a run that reaches max_turns.
+    """
+
+    def __init__(
+            self,
+            max_turns: int = None,
+            max_cycle_length: int = 4,
+            max_repeats: int = 3,
+            max_stalled: int = 4,
+            max_hints: int = 2
+    ):
+        self.max_turns = max_turns
+        self.max_cycle_length = max_cycle_length
+        self.max_repeats = max_repeats
+        self.max_stalled = max_stalled
+        self.max_hints = max_hints
+        self.reset()
+
+    def reset(self):
+        self._keys = deque(maxlen=self.max_cycle_length * self.max_repeats)
+        self._stalled = 0
+        self._previous = None
+        self.loops = 0
+        self.stalls = 0
+        self.hints = 0
+        self.aborted = None
+
+    def stats(self) -> dict:
+        return {"loops": self.loops, "stalls": self.stalls, "hints": self.hints, "aborted": self.aborted}
+
+    def observe(self, name: str, args: dict, url: str, frame_hash: str = None, observed: bool = True, unchanged: bool = False):
+        """Record one executed action and the state it left the page in."""
+        self._keys.append((name, json.dumps(args, sort_keys=True, default=str), url, frame_hash))
+        if not observed:
+            # Intermediate actions of a turn are not screenshotted, so they say nothing about progress.
+            return
+        state = (url, frame_hash)
+        if unchanged or (frame_hash is not None and state == self._previous):
+            self._stalled += 1
+        else:
+            self._stalled = 0
+        self._previous = state
+
+    def _cycle_length(self):
+        keys = list(self._keys)
+        for length in range(1, self.max_cycle_length + 1):
+            span = length * self.max_repeats
+            if len(keys) < span:
+                break
+            tail = keys[-span:]
+            if all(tail[i] == tail[i % length] for i in range(span)):
+                return length
+        return None
+
+    def check_turns(self, turns: int):
+        """Raises RunAborted once the run has used up max_turns."""
+        if self.max_turns is not None and turns >= self.max_turns:
+            self.aborted = f"Reached the limit of {self.max_turns} turns."
+            raise RunAborted(self.aborted)
+
+    def check(self, turns: int):
+        """Called after every turn. Returns a hint for the model, or None, and raises RunAborted when out of options."""
+        self.check_turns(turns)
+
+        hint = None
+        length = self._cycle_length()
+        if length is not None:
+            self.loops += 1
+            hint = LOOP_HINT.format(length=length, repeats=self.max_repeats)
+        elif self._stalled >= self.max_stalled:
+            self.stalls += 1
+            hint = STALL_HINT.format(count=self._stalled)
+        if hint is None:
+            return None
+        if self.hints >= self.max_hints:
+            self.aborted = "Stuck in a loop." if length is not None else f"No progress in the last {self._stalled} actions."
+            raise RunAborted(self.aborted)
+        self.hints += 1
+        # Start over, so the same repetitions are not reported again on the next turn.
+        self._keys.clear()
+        self._stalled = 0
+        return hint
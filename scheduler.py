@@ -0,0 +1,235 @@
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+
+import httpx
+from google.genai import errors
+
+from tracing import percentile
+
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, errors.APIError) and error.code == 429
+
+
+class TokenBucket:
+    """Requests-per-second limiter.
+
+    Callers reserve a token up front and then sleep until it is theirs, so waiters are served in order.
+    It holds no asyncio state, so one bucket can be shared by agents running on different event loops.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token, going into debt if there is none, and return the seconds until it is available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class _ModelStats:
+    def __init__(self, window: int):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.errors = 0
+        self.queue_time = 0.0
+        self.queue_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+
+    def to_dict(self) -> dict:
+        queue_times = sorted(self.queue_times)
+        latencies = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "errors": self.errors,
+            "queue_time_s": self.queue_time,
+            "p50_queue_ms": percentile(queue_times, 50) * 1000,
+            "p95_queue_ms": percentile(queue_times, 95) * 1000,
+            "p50_latency_ms": percentile(latencies, 50) * 1000,
+            "p95_latency_ms": percentile(latencies, 95) * 1000,
+        }
+
+
+class RequestScheduler:
+    """Sends model requests for every agent in the process.
+
+    requests_per_minute: per-model limits, e.g. {"gemini-2.5-flash": 60}. Models without a limit are not throttled.
+    max_retries: retries of timeouts, connection errors, 429s and 5xx, with full-jitter exponential backoff.
+        A 429 pauses every request to that model for the backoff, whether or not it has a limit.
+    hedge: once a model has hedge_min_samples latencies, a request still running after the p95 latency gets
+        a duplicate (if the rate limit allows it right away), and whichever reply arrives first is used.
+    timeout: seconds before a single attempt is abandoned and retried.
+    """
+
+    _default = None
+
+    def __init__(
+            self,
+            requests_per_minute: dict[str, float] = None,
+            burst: float = 1.0,
+            max_retries: int = 4,
+            base_backoff: float = 1.0,
+            max_backoff: float = 30.0,
+            hedge: bool = False,
+            hedge_min_samples: int = 20,
+            timeout: float = None,
+            window: int = 200
+    ):
+        self._buckets = {model: TokenBucket(rpm / 60, burst) for model, rpm in (requests_per_minute or {}).items()}
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.timeout = timeout
+        self._window = window
+        self._stats = {}
+        # Per model, the monotonic time until which requests are held back after a 429.
+        self._paused_until = {}
+
+    @classmethod
+    def default(cls) -> "RequestScheduler":
+        """Process-wide scheduler used by agents that are not given one."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def _model_stats(self, model: str) -> _ModelStats:
+        if model not in self._stats:
+            self._stats[model] = _ModelStats(self._window)
+        return self._stats[model]
+
+    def stats(self) -> dict:
+        return {model: stats.to_dict() for model, stats in self._stats.items()}
+
+    async def _wait_for_pause(self, model: str) -> float:
+        wait = self._paused_until.get(model, 0.0) - time.monotonic()
+        if wait <= 0:
+            return 0.0
+        await asyncio.sleep(wait)
+        return wait
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def _hedge_delay(self, stats: _ModelStats):
+        if not self.hedge or len(stats.latencies) < self.hedge_min_samples:
+            return None
+        return percentile(sorted(stats.latencies), 95)
+
+    async def _send(self, request):
+        if self.timeout is None:
+            return await request()
+        return await asyncio.wait_for(request(), self.timeout)
+
+    async def _attempt(self, model: str, request, stats: _ModelStats, hedge: bool) -> tuple:
+        """Send one attempt, hedged if it is slow. Returns (result, whether a duplicate was sent)."""
+        primary = asyncio.ensure_future(self._send(request))
+        pending = {primary}
+        try:
+            delay = self._hedge_delay(stats) if hedge else None
+            if delay is None:
+                return await primary, False
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            bucket = self._buckets.get(model)
+            if done or (bucket is not None and not bucket.try_acquire()):
+                return await primary, False
+
+            stats.hedges += 1
+            backup = asyncio.ensure_future(self._send(request))
+            pending.add(backup)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            stats.hedge_wins += 1
+                        return task.result(), True
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, model: str, request, hedge: bool = True, span=None):
+        """Run `request` (a function returning a new request coroutine) under the limits of `model`.
+
+        Pass hedge=False for requests that must not be sent twice, e.g. streams. With a tracing span, the
+        queue time, attempts and whether the request was hedged are attached to it.
+        """
+        stats = self._model_stats(model)
+        bucket = self._buckets.get(model)
+        queue_time = 0.0
+        for attempt in range(self.max_retries + 1):
+            queue_time += await self._wait_for_pause(model)
+            if bucket is not None:
+                queue_time += await bucket.acquire()
+            start = time.monotonic()
+            try:
+                result, hedged = await self._attempt(model, request, stats, hedge)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    stats.errors += 1
+                    raise
+                delay = self._backoff(attempt)
+                stats.retries += 1
+                print(f"Request to {model} failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s.")
+                if is_rate_limited(e):
+                    # Everyone waits, this caller included, at the top of the next attempt.
+                    stats.rate_limited += 1
+                    self._paused_until[model] = max(self._paused_until.get(model, 0.0), time.monotonic() + delay)
+                    continue
+                await asyncio.sleep(delay)
+                queue_time += delay
+                continue
+
+            stats.requests += 1
+            stats.latencies.append(time.monotonic() - start)
+            stats.queue_time += queue_time
+            stats.queue_times.append(queue_time)
+            if span is not None:
+                span.set(queue_s=queue_time, attempts=attempt + 1, hedged=hedged)
+            return result
@@ -0,0 +1,190 @@
+import io
+import os
+import json
+import asyncio
+
+import pytest
+
+pytest.importorskip("google.genai")
+pytest.importorskip("playwright")
+Image = pytest.importorskip("PIL.Image")
+
+from benchmarks.fake_client import FakeGenaiClient
+from checkpoint import Checkpoint
+from computers.playwright import EnvState
+from scheduler import RequestScheduler
+from webagent import AsyncWebAgent, CHECKPOINT_DIR, PLANNER_MODEL
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _png(shade: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 40), (shade, shade, shade)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class StubComputer:
+    """Page that moves to a new URL on every click and writes storage state the way Playwright does."""
+
+    def __init__(self, url: str = "http://example.test/0"):
+        self.tracer = None
+        self.started = False
+        self.url = url
+        self.initial_url = url
+        self.frame_cache = None
+        self.clicks = []
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.started = False
+
+    def screen_size(self):
+        return 1440, 900
+
+    async def current_state(self, observe: bool = True):
+        if not observe:
+            return EnvState(screenshot=None, url=self.url)
+        shade = int(self.url.rsplit("/", 1)[-1]) * 20
+        return EnvState(screenshot=_png(shade), url=self.url, frame_hash=f"{shade:016x}")
+
+    async def navigate(self, url: str, observe: bool = True):
+        self.url = url
+        return await self.current_state(observe)
+
+    async def click_at(self, x: int, y: int, observe: bool = True):
+        self.clicks.append((x, y))
+        self.url = f"http://example.test/{int(self.url.rsplit('/', 1)[-1]) + 1}"
+        return await self.current_state(observe)
+
+    async def save_storage_state(self, path: str):
+        with open(path, "w") as fp:
+            json.dump({"cookies": [], "origins": []}, fp)
+
+
+class CrashingClient(FakeGenaiClient):
+    """Scripted client that records the size of every request and fails once crash_after turns were answered."""
+
+    def __init__(self, turns, crash_after: int = None):
+        super().__init__(turns)
+        self.crash_after = crash_after
+        self.request_sizes = []
+
+    async def respond(self, model: str, contents):
+        if model != PLANNER_MODEL:
+            self.request_sizes.append(len(contents))
+            if self.crash_after is not None and len(self.request_sizes) > self.crash_after:
+                raise RuntimeError("process killed")
+        return await super().respond(model, contents)
+
+
+def _turns(count: int):
+    return [(f"Click {idx}.", [("click_at", {"x": 100 + idx, "y": 100})]) for idx in range(count)]
+
+
+def _agent(computer, client, screenshot_dir):
+    return AsyncWebAgent(
+        verbose=False,
+        computer=computer,
+        client=client,
+        screenshot_dir=screenshot_dir,
+        interactive=False,
+        scheduler=RequestScheduler(max_retries=0)
+    )
+
+
+def test_killed_run_resumes_from_last_turn(tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    screenshot_dir = str(tmp_path / "run")
+    turns = _turns(5)
+
+    async def crash():
+        computer = StubComputer()
+        agent = _agent(computer, CrashingClient(turns, crash_after=3), screenshot_dir)
+        try:
+            with pytest.raises(RuntimeError):
+                await agent.run("Click five times.", use_plan_cache=False, replay=False)
+        finally:
+            await agent.close()
+        return computer
+
+    async def resume():
+        computer = StubComputer()
+        client = CrashingClient(turns[3:])
+        agent = _agent(computer, client, screenshot_dir)
+        try:
+            return await agent.resume(), computer, client
+        finally:
+            await agent.close()
+
+    crashed = asyncio.run(crash())
+    assert len(crashed.clicks) == 3
+    checkpoint = Checkpoint(os.path.join(screenshot_dir, CHECKPOINT_DIR))
+    state = checkpoint.read_state()
+    assert state["status"] == "running"
+    assert state["iteration"] == 3
+    # The plan and three (model, function response) turns.
+    assert state["entries"] == 7
+    assert state["url"] == "http://example.test/3"
+    assert os.path.exists(checkpoint.storage_state_path)
+
+    result, computer, client = asyncio.run(resume())
+    assert result == "Done."
+    assert computer.url == "http://example.test/5"
+    assert len(computer.clicks) == 2
+    # The restored conversation plus the note showing the model the current page.
+    assert client.request_sizes[0] == 8
+    assert checkpoint.read_state()["status"] == "complete"
+
+
+class FlakyStorageComputer(StubComputer):
+    """StubComputer whose storage state cannot be saved once, e.g. because the page was navigating."""
+
+    def __init__(self, fail_on: int, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_on = fail_on
+        self.saves = 0
+
+    async def save_storage_state(self, path: str):
+        self.saves += 1
+        if self.saves == self.fail_on:
+            raise RuntimeError("storage state unavailable")
+        await super().save_storage_state(path)
+
+
+def test_failed_storage_state_keeps_the_turn(tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    screenshot_dir = str(tmp_path / "run")
+    turns = _turns(5)
+
+    async def crash():
+        computer = FlakyStorageComputer(fail_on=2)
+        agent = _agent(computer, CrashingClient(turns, crash_after=3), screenshot_dir)
+        try:
+            with pytest.raises(RuntimeError, match="process killed"):
+                await agent.run("Click five times.", use_plan_cache=False, replay=False)
+        finally:
+            await agent.close()
+        return computer
+
+    async def resume():
+        computer = StubComputer()
+        client = CrashingClient(turns[3:])
+        agent = _agent(computer, client, screenshot_dir)
+        try:
+            return await agent.resume(), client
+        finally:
+            await agent.close()
+
+    crashed = asyncio.run(crash())
+    assert crashed.saves >= 2
+    state = Checkpoint(os.path.join(screenshot_dir, CHECKPOINT_DIR)).read_state()
+    # The turn whose storage state failed is still in the log.
+    assert state["iteration"] == 3
+    assert state["entries"] == 7
+
+    result, client = asyncio.run(resume())
+    assert result == "Done."
+    assert client.request_sizes[0] == 8
@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+pytest.importorskip("google.genai")
+pytest.importorskip("playwright")
+Image = pytest.importorskip("PIL.Image")
+
+from google.genai import types
+
+from computers.accessibility import DIFF_SNAPSHOT_HEADER, FULL_SNAPSHOT_HEADER
+from history import ConversationHistory, _text_size, estimate_content_size
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 40), (128, 128, 128)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _turn(idx: int, screenshot: bytes) -> tuple[types.Content, types.Content]:
+    model = types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name="click_at", args={"x": idx, "y": idx}))]
+    )
+    response = types.FunctionResponse(
+        name="click_at",
+        response={"url": f"https://example.test/{idx}"},
+        parts=[types.FunctionResponsePart(inline_data=types.FunctionResponseBlob(mime_type="image/png", data=screenshot))]
+    )
+    return model, types.Content(role="user", parts=[types.Part(function_response=response)])
+
+
+def _actual_totals(history: ConversationHistory) -> tuple[int, int]:
+    entries = [history._pinned] + list(history._entries)
+    tokens = sum(estimate_content_size(entry.content)[0] for entry in entries)
+    size = sum(estimate_content_size(entry.content)[1] for entry in entries)
+    for line in history._summary_lines:
+        t, b = _text_size(line)
+        tokens, size = tokens + t, size + b
+    return tokens, size
+
+
+def test_totals_stay_exact_when_budget_evicts_screenshot_turns():
+    screenshot = _png()
+    history = ConversationHistory(max_turns_with_screenshots=3, max_tokens=2500)
+    # The first message carries the start page, so it sits in front of the screenshot queue.
+    history.append(types.Content(role="user", parts=[
+        types.Part(text="Plan: click around."),
+        types.Part(inline_data=types.Blob(mime_type="image/png", data=screenshot)),
+    ]))
+    for idx in range(20):
+        for content in _turn(idx, screenshot):
+            history.append(content)
+        assert (history.total_tokens, history.total_bytes) == _actual_totals(history)
+        assert history.total_tokens <= 2500 or len(history._entries) <= history.min_recent_entries
+    assert len(history._screenshot_entries) <= history.max_turns_with_screenshots
+    assert all(not entry.evicted for entry in history._screenshot_entries)
+
+
+def _snapshot_turn(idx: int, snapshot: str) -> tuple[types.Content, types.Content]:
+    model = types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name="scroll_document", args={"direction": "down"}))]
+    )
+    response = types.FunctionResponse(
+        name="scroll_document",
+        response={"url": f"https://example.test/{idx}", "accessibility_snapshot": snapshot}
+    )
+    return model, types.Content(role="user", parts=[types.Part(function_response=response)])
+
+
+def test_old_accessibility_snapshots_are_stripped():
+    history = ConversationHistory(max_turns_with_screenshots=2)
+    history.append(types.Content(role="user", parts=[types.Part(text="Plan: scroll.")]))
+    full = FULL_SNAPSHOT_HEADER + "\n" + "\n".join(f'link "Issue {idx}" @(100,{idx})' for idx in range(300))
+    for content in _snapshot_turn(0, full):
+        history.append(content)
+    assert not history.snapshot_base_lost
+    for idx in range(1, 4):
+        for content in _snapshot_turn(idx, f"{DIFF_SNAPSHOT_HEADER}\n+ text \"row {idx}\" @(10,10)"):
+            history.append(content)
+        assert (history.total_tokens, history.total_bytes) == _actual_totals(history)
+
+    responses = [
+        part.function_response.response
+        for content in history.contents()
+        for part in content.parts or []
+        if part.function_response
+    ]
+    assert sum("accessibility_snapshot" in response for response in responses) == 2
+    assert all(FULL_SNAPSHOT_HEADER not in response.get("accessibility_snapshot", "") for response in responses)
+    # The full snapshot the remaining diffs apply to is gone, so the next observation has to be a full one.
+    assert history.snapshot_base_lost
+    assert history.total_tokens < len(full) // 4
@@ -0,0 +1,62 @@
+import time
+import asyncio
+
+import pytest
+
+errors = pytest.importorskip("google.genai.errors")
+
+from scheduler import RequestScheduler
+
+MODEL = "test-model"
+BACKOFF = 0.3
+# asyncio timers may fire slightly early or late.
+SLACK = 0.05
+
+
+def _rate_limited():
+    return errors.APIError(429, {"error": {"code": 429, "message": "rate limited", "status": "RESOURCE_EXHAUSTED"}})
+
+
+def test_rate_limit_pauses_every_caller_once(monkeypatch):
+    scheduler = RequestScheduler(max_retries=2)
+    monkeypatch.setattr(scheduler, "_backoff", lambda attempt: BACKOFF)
+    attempts = {"first": [], "second": []}
+    failed = asyncio.Event()
+
+    async def first_request():
+        attempts["first"].append(time.monotonic())
+        if len(attempts["first"]) == 1:
+            failed.set()
+            raise _rate_limited()
+        return "first"
+
+    async def second_request():
+        attempts["second"].append(time.monotonic())
+        return "second"
+
+    async def second_caller():
+        # Arrives while the first caller is backing off from its 429.
+        await failed.wait()
+        await asyncio.sleep(BACKOFF / 3)
+        return await scheduler.call(MODEL, second_request, hedge=False)
+
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(scheduler.call(MODEL, first_request, hedge=False), second_caller())
+        return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == ["first", "second"]
+    failed_at = attempts["first"][0]
+    # The retry waits for the backoff once, not once for the pause and again for its own backoff.
+    assert attempts["first"][1] - failed_at >= BACKOFF - SLACK
+    assert elapsed < 2 * BACKOFF - SLACK
+    # The other caller is held back until the pause ends, and sent only once.
+    assert len(attempts["second"]) == 1
+    assert attempts["second"][0] - failed_at >= BACKOFF - SLACK
+
+    stats = scheduler.stats()[MODEL]
+    assert stats["requests"] == 2
+    assert stats["retries"] == 1
+    assert stats["rate_limited"] == 1
+    assert stats["errors"] == 0
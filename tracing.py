@@ -0,0 +1,132 @@
+import json
+import math
+import time
+import functools
+import itertools
+import contextlib
+from rich.table import Table
+
+_tracer_ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "track", "attrs")
+
+    def __init__(self, name: str, start: float, track: str, attrs: dict):
+        self.name = name
+        self.start = start
+        self.duration = None
+        self.track = track
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "start_ms": round(self.start * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "track": self.track,
+            **self.attrs,
+        }
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Tracer:
+    """Collects timing spans for one agent run.
+
+    Spans carry free-form attributes such as byte counts and the iteration they belong to, and can be
+    exported as JSONL or as Chrome trace JSON (open in chrome://tracing or ui.perfetto.dev). Work that runs
+    off the agent's critical path (e.g. disk writes) goes on its own track so it shows up as a separate row.
+    """
+
+    def __init__(self, name: str = None):
+        self.id = next(_tracer_ids)
+        self.name = name or f"agent-{self.id}"
+        self.spans: list[Span] = []
+        self.iteration = None
+        self._origin = time.perf_counter()
+        # Wall-clock time of the origin, so traces of concurrent agents can be lined up.
+        self._origin_wall = time.time()
+
+    @contextlib.contextmanager
+    def span(self, name: str, track: str = "agent", **attrs):
+        if self.iteration is not None:
+            attrs.setdefault("iteration", self.iteration)
+        span = Span(name, time.perf_counter() - self._origin, track, attrs)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - self._origin - span.start
+            self.spans.append(span)
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in self.spans)
+
+    def to_chrome_trace(self) -> dict:
+        tracks = {}
+        events = []
+        base_us = self._origin_wall * 1e6
+        for span in self.spans:
+            tid = tracks.setdefault(span.track, len(tracks) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.track,
+                "ph": "X",
+                "ts": base_us + span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": self.id,
+                "tid": tid,
+                "args": span.attrs,
+            })
+        events.append({"name": "process_name", "ph": "M", "pid": self.id, "args": {"name": self.name}})
+        for track, tid in tracks.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": self.id, "tid": tid, "args": {"name": track}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> dict:
+        durations = {}
+        for span in self.spans:
+            durations.setdefault(span.name, []).append(span.duration)
+        summary = {}
+        for name, values in durations.items():
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "total_s": sum(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+            }
+        return summary
+
+    def summary_table(self) -> Table:
+        table = Table(title=f"Latency per stage ({self.name})", expand=False)
+        table.add_column("Stage", style="cyan")
+        table.add_column("Count", justify="right")
+        table.add_column("p50 (ms)", justify="right")
+        table.add_column("p95 (ms)", justify="right")
+        table.add_column("Total (s)", justify="right")
+        stats = self.summary()
+        for name in sorted(stats, key=lambda n: -stats[n]["total_s"]):
+            s = stats[name]
+            table.add_row(name, str(s["count"]), f"{s['p50_ms']:.1f}", f"{s['p95_ms']:.1f}", f"{s['total_s']:.2f}")
+        return table
+
+
+def traced(name: str):
+    """Wrap an async method of an object with a `tracer` attribute in a span."""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return await method(self, *args, **kwargs)
+        return wrapper
+    return decorator
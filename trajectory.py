@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import asyncio
+import tempfile
+
+from computers.frame_hash import hamming_distance
+from plan_cache import hash_text, normalize_query
+
+DEFAULT_TRAJECTORY_DIR = "trajectories"
+
+
+class Trajectory:
+    """The exact action sequence of one run, with the URL and screenshot hash seen before each action."""
+
+    def __init__(self, query: str, initial_url: str, steps: list[dict] = None, final_reasoning: str = None, created_at: float = None):
+        self.query = query
+        self.initial_url = initial_url
+        self.steps = steps if steps is not None else []
+        self.final_reasoning = final_reasoning
+        self.created_at = created_at or time.time()
+
+    def record(self, turn: int, name: str, args: dict, pre_url: str, pre_frame_hash: str, post_url: str, post_frame_hash: str, requires_confirmation: bool = False):
+        self.steps.append({
+            "turn": turn,
+            "name": name,
+            "args": args,
+            "pre_url": pre_url,
+            "pre_frame_hash": pre_frame_hash,
+            "post_url": post_url,
+            "post_frame_hash": post_frame_hash,
+            "requires_confirmation": requires_confirmation,
+        })
+
+    def to_dict(self) -> dict:
+        return {
+            "query": self.query,
+            "initial_url": self.initial_url,
+            "created_at": self.created_at,
+            "final_reasoning": self.final_reasoning,
+            "steps": self.steps,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trajectory":
+        return cls(
+            query=data["query"],
+            initial_url=data["initial_url"],
+            steps=data["steps"],
+            final_reasoning=data.get("final_reasoning"),
+            created_at=data.get("created_at")
+        )
+
+
+def _normalize_url(url: str) -> str:
+    return (url or "").split("#", 1)[0].rstrip("/")
+
+
+class TrajectoryStore:
+    """Stores the trajectory of the last successful run of each (query, initial URL) as JSON.
+
+    max_hash_distance is how many bits of the 64-bit screenshot hash may differ before a replay checkpoint
+    counts as diverged, which tolerates clocks, avatars and other small dynamic content.
+    """
+
+    def __init__(self, root: str = DEFAULT_TRAJECTORY_DIR, max_hash_distance: int = 6):
+        self._root = root
+        self.max_hash_distance = max_hash_distance
+        if not os.path.exists(self._root):
+            os.makedirs(self._root, exist_ok=True)
+
+    def _path(self, query: str, initial_url: str) -> str:
+        key = hash_text(normalize_query(query) + "\n" + _normalize_url(initial_url))
+        return os.path.join(self._root, f"{key}.json")
+
+    def _load(self, path: str):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as fp:
+            return Trajectory.from_dict(json.load(fp))
+
+    def _save(self, path: str, data: dict):
+        # Write to a temporary file first so concurrent readers never see a partial trajectory.
+        # A unique name per writer, as several workers of one process may save the same task at once.
+        fd, tmp_path = tempfile.mkstemp(dir=self._root, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(data, fp, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    async def load(self, query: str, initial_url: str):
+        return await asyncio.to_thread(self._load, self._path(query, initial_url))
+
+    async def save(self, trajectory: Trajectory):
+        await asyncio.to_thread(self._save, self._path(trajectory.query, trajectory.initial_url), trajectory.to_dict())
+
+    def _same_page(self, recorded_url: str, recorded_hash: str, url: str, frame_hash: str) -> bool:
+        if _normalize_url(recorded_url) != _normalize_url(url):
+            return False
+        if recorded_hash is None or frame_hash is None:
+            return True
+        return hamming_distance(int(recorded_hash, 16), int(frame_hash, 16)) <= self.max_hash_distance
+
+    def matches(self, step: dict, url: str, frame_hash: str) -> bool:
+        """Whether the current page still looks like the one the step was recorded on."""
+        return self._same_page(step["pre_url"], step["pre_frame_hash"], url, frame_hash)
+
+    def matches_outcome(self, step: dict, url: str, frame_hash: str) -> bool:
+        """Whether the current page looks like the one the step left behind when it was recorded."""
+        return self._same_page(step["post_url"], step["post_frame_hash"], url, frame_hash)
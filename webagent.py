@@ -1,34 +1,84 @@
 import os
 from typing import Any
 import argparse
+import asyncio
 import sys
+import time
 from datetime import datetime
 import termcolor
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from PIL import Image
-import io
 
 from google import genai
 from google.genai import types
 
-from computers.playwright import PlaywrightComputer
+from artifacts import ArtifactWriter
+from checkpoint import Checkpoint, snapshot_content
+from history import ConversationHistory
+from plan_cache import PlanCache, hash_text
+from progress import ProgressMonitor, RunAborted
+from scheduler import RequestScheduler
+from trajectory import Trajectory, TrajectoryStore
+from tracing import Tracer
+from computers.playwright import AsyncPlaywrightComputer, PlaywrightComputer
+from computers.accessibility import NO_CHANGE_NOTE
+from computers.encoding import ScreenshotEncoding
+from computers.frame_hash import FrameCache
+from computers.routing import make_routing_policy
+from computers.settle import SettlePolicy
 
 PLAYWRIGHT_SCREEN_SIZE = (1440, 900)
+PLANNER_MODEL = "gemini-2.5-flash"
+COMPUTER_USE_MODEL = "gemini-2.5-computer-use-preview-10-2025"
 MAX_RECENT_TURN_WITH_SCREENSHOTS = 3
+MAX_TURNS = 100
+UNCHANGED_SCREEN_NOTE = "The screen did not change after this action, it is identical to the previous screenshot."
+NOT_OBSERVED_NOTE = "No screenshot for this intermediate action, the last action of this turn shows the resulting screen."
+RESUMED_NOTE = "The session was interrupted and has been resumed. The page may have changed since the last action, this is its current state."
+CHECKPOINT_DIR = "checkpoint"
 
-class WebAgent:
+
+class SafetyConfirmationRequired(Exception):
+    """Raised instead of prompting for human intervention when the agent is not interactive."""
+
+
+class AsyncWebAgent:
     def __init__(
             self,
             verbose: bool = True,
             console: Console = None,
             context_state_path: str = None,
-            initial_url: str = None
+            initial_url: str = None,
+            computer: AsyncPlaywrightComputer = None,
+            client: genai.Client = None,
+            screenshot_dir: str = None,
+            interactive: bool = True,
+            history: ConversationHistory = None,
+            plan_cache: PlanCache = None,
+            trajectory_store: TrajectoryStore = None,
+            observe_every_action: bool = False,
+            tracer: Tracer = None,
+            stream: bool = False,
+            scheduler: RequestScheduler = None,
+            progress: ProgressMonitor = None,
+            checkpoint: bool = True
     ):
-        self._client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        self._client = client or genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        # Rate limits, retries and hedging of model requests, shared by all agents in the process by default.
+        self._scheduler = scheduler or RequestScheduler.default()
+        # Turn budget and loop/stall detection.
+        self.progress = progress or ProgressMonitor(max_turns=MAX_TURNS)
         with open("prompts/planner_prompt.md", "r") as fp:
             planner_prompt = fp.read()
+        self._planner_prompt_hash = hash_text(planner_prompt)
+        self._plan_cache = plan_cache
+        self._trajectory_store = trajectory_store
+        self._trajectory = None
+        # When a turn holds several function calls, only the last one is screenshotted unless this is set.
+        self._observe_every_action = observe_every_action
+        # Stream model responses and start executing function calls before the whole response has arrived.
+        self._stream = stream
         self._gemini_flash_use_generation_content_config = types.GenerateContentConfig(system_instruction=planner_prompt)
         self._computer_use_generation_content_config = types.GenerateContentConfig(
             temperature=1,
@@ -47,19 +97,78 @@ class WebAgent:
                 )
             ]
         )
-        # Directly jump to App page at the beginning
-        self.playwright = PlaywrightComputer(PLAYWRIGHT_SCREEN_SIZE, context_state_path=context_state_path, initial_url=initial_url)
-        self._contents = []
+        # Directly jump to App page at the beginning. The computer is launched in start() unless it already runs.
+        self._owns_computer = computer is None
+        if computer is None:
+            computer = AsyncPlaywrightComputer(PLAYWRIGHT_SCREEN_SIZE, context_state_path=context_state_path, initial_url=initial_url)
+        self.playwright = computer
+        # One tracer for the agent and its computer, so model and browser spans share a timeline.
+        self.tracer = tracer or Tracer()
+        self.playwright.tracer = self.tracer
+        self._history = history or ConversationHistory(max_turns_with_screenshots=MAX_RECENT_TURN_WITH_SCREENSHOTS)
         self._verbose = verbose
         if verbose and console is None:
             raise ValueError("Console must be provided in verbose mode.")
         self._console = console
+        self._interactive = interactive
 
-        folder_name = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self._folder_path = os.path.join("screenshots", folder_name)
-        if not os.path.exists(self._folder_path):
-            os.makedirs(self._folder_path)
+        if screenshot_dir is None:
+            folder_name = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            screenshot_dir = os.path.join("screenshots", folder_name)
+        self._folder_path = screenshot_dir
+        self._artifacts = ArtifactWriter(self._folder_path, tracer=self.tracer)
+        # After every turn the conversation, URL and storage state are saved so that resume() can continue the run.
+        self._checkpoint = Checkpoint(os.path.join(self._folder_path, CHECKPOINT_DIR)) if checkpoint else None
+        # Snapshots of the Contents added to the history since the last checkpoint.
+        self._checkpoint_pending = []
+        self._query = None
         self._iteration = 0
+        self._final_reasoning = None
+        self._last_screenshot_name = None
+        # Observation the next action starts from, recorded as the trajectory checkpoint.
+        self._last_url = None
+        self._last_frame_hash = None
+        self._startup = None
+        # Rendering and artifact writes run here, off the path between one model request and the next.
+        self._side_tasks = _SideTasks(tracer=self.tracer)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        await self._begin_startup()
+
+    def _begin_startup(self):
+        # Shared by everything that needs the browser, so it is launched once however many callers wait on it.
+        if self._startup is None:
+            self._startup = asyncio.ensure_future(self._start_computer())
+        return self._startup
+
+    async def _start_computer(self):
+        if not self.playwright.started:
+            with self.tracer.span("startup"):
+                await self.playwright.start()
+
+    async def close(self):
+        if self._startup is not None and not self._startup.done():
+            self._startup.cancel()
+            await asyncio.gather(self._startup, return_exceptions=True)
+        await self._side_tasks.close()
+        await self._artifacts.close()
+        if self._owns_computer:
+            await self.playwright.close()
+
+    @property
+    def artifacts(self):
+        return self._artifacts
+
+    @property
+    def history(self):
+        return self._history
 
     def denormalize_x(self, x: int):
         return int(x / 1000 * self.playwright.screen_size()[0])
@@ -67,45 +176,48 @@ class WebAgent:
     def denormalize_y(self, y: int):
         return int(y / 1000 * self.playwright.screen_size()[1])
 
-    def handle_action(self, action: types.FunctionCall):
+    async def handle_action(self, action: types.FunctionCall, observe: bool = True):
+        # Callers that drive the agent step by step may not have started the browser.
+        await self.start()
         fname = action.name
         args = action.args
         if fname == "open_web_browser":
-            return self.playwright.open_browser()
+            return await self.playwright.open_browser(observe)
         elif fname == "wait_5_seconds":
             pass
         elif fname == "drag_and_drop":
             pass
         elif fname == "go_back":
-            return self.playwright.go_back()
+            return await self.playwright.go_back(observe)
         elif fname == "go_forward":
-            return self.playwright.go_forward()
+            return await self.playwright.go_forward(observe)
         elif fname == "search":
-            return self.playwright.search()
+            return await self.playwright.search(observe)
         elif fname == "navigate":
-            return self.playwright.navigate(args["url"])
+            return await self.playwright.navigate(args["url"], observe)
         elif fname == "click_at":
             x = self.denormalize_x(args["x"])
             y = self.denormalize_y(args["y"])
-            return self.playwright.click_at(x, y)
+            return await self.playwright.click_at(x, y, observe)
         elif fname == "hover_at":
             x = self.denormalize_x(args["x"])
             y = self.denormalize_y(args["y"])
-            return self.playwright.hover_at(x, y)
+            return await self.playwright.hover_at(x, y, observe)
         elif fname == "type_text_at":
             x = self.denormalize_x(args["x"])
             y = self.denormalize_y(args["y"])
-            return self.playwright.type_text_at(
+            return await self.playwright.type_text_at(
                 x,
                 y,
                 args["text"],
                 args.get("press_enter", True),
-                args.get("clear_before_typing", True)
+                args.get("clear_before_typing", True),
+                observe
             )
         elif fname == "key_combination":
-            return self.playwright.key_combination(args["keys"].split("+"))
+            return await self.playwright.key_combination(args["keys"].split("+"), observe)
         elif fname == "scroll_document":
-            return self.playwright.scroll_document(args["direction"])
+            return await self.playwright.scroll_document(args["direction"], observe)
         elif fname == "scroll_at":
             x = self.denormalize_x(args["x"])
             y = self.denormalize_y(args["y"])
@@ -118,21 +230,92 @@ class WebAgent:
                 magnitude = self.denormalize_x(magnitude)
             else:
                 raise ValueError("Unknown direction: ", direction)
-            return self.playwright.scroll_at(x, y, direction, magnitude)
+            return await self.playwright.scroll_at(x, y, direction, magnitude, observe)
         else:
             raise ValueError(f"Unsupported function call: {action}")
 
 
-    def get_model_response(self):
-        try:
-            response = self._client.models.generate_content(
-                model="gemini-2.5-computer-use-preview-10-2025",
-                contents=self._contents,
-                config=self._computer_use_generation_content_config
+    async def get_model_response(self):
+        with self.tracer.span("model_call") as span:
+            contents = self._history.contents()
+            prompt_tokens, prompt_bytes = self._history.request_sizes[-1]
+            span.set(prompt_bytes=prompt_bytes, prompt_estimated_tokens=prompt_tokens)
+            response = await self._scheduler.call(
+                COMPUTER_USE_MODEL,
+                lambda: self._client.aio.models.generate_content(
+                    model=COMPUTER_USE_MODEL,
+                    contents=contents,
+                    config=self._computer_use_generation_content_config
+                ),
+                span=span
             )
-            return response
-        except Exception as e:
-            print(e)
+            if response.usage_metadata:
+                span.set(
+                    prompt_tokens=response.usage_metadata.prompt_token_count,
+                    output_tokens=response.usage_metadata.candidates_token_count
+                )
+        return response
+
+    async def get_streamed_model_response(self, on_function_call=None) -> types.GenerateContentResponse:
+        """Stream the response of the computer-use model, handing each function call to on_function_call as
+        soon as its part has arrived. The chunks are assembled into one response, so the history ends up the
+        same as without streaming."""
+        with self.tracer.span("model_call", streamed=True) as span:
+            start = time.perf_counter()
+            contents = self._history.contents()
+            prompt_tokens, prompt_bytes = self._history.request_sizes[-1]
+            span.set(prompt_bytes=prompt_bytes, prompt_estimated_tokens=prompt_tokens)
+            parts = []
+            finish_reason = None
+            usage_metadata = None
+            # Only opening the stream is retried: once actions have been dispatched, the request cannot be resent.
+            stream = await self._scheduler.call(
+                COMPUTER_USE_MODEL,
+                lambda: self._client.aio.models.generate_content_stream(
+                    model=COMPUTER_USE_MODEL,
+                    contents=contents,
+                    config=self._computer_use_generation_content_config
+                ),
+                hedge=False,
+                span=span
+            )
+            async for chunk in stream:
+                if chunk.usage_metadata:
+                    usage_metadata = chunk.usage_metadata
+                if not chunk.candidates:
+                    continue
+                candidate = chunk.candidates[0]
+                if candidate.finish_reason:
+                    finish_reason = candidate.finish_reason
+                if not candidate.content or not candidate.content.parts:
+                    continue
+                for part in candidate.content.parts:
+                    if _continues_text(parts[-1] if parts else None, part):
+                        parts[-1] = types.Part(
+                            text=parts[-1].text + part.text,
+                            thought=parts[-1].thought,
+                            thought_signature=part.thought_signature
+                        )
+                    else:
+                        parts.append(part)
+                    if part.function_call and on_function_call is not None:
+                        if "first_function_call_s" not in span.attrs:
+                            span.set(first_function_call_s=time.perf_counter() - start)
+                        on_function_call(part.function_call)
+            if usage_metadata:
+                span.set(
+                    prompt_tokens=usage_metadata.prompt_token_count,
+                    output_tokens=usage_metadata.candidates_token_count
+                )
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(role="model", parts=parts) if parts else None,
+                    finish_reason=finish_reason
+                )
+            ],
+            usage_metadata=usage_metadata
+        )
 
     # Retrieve reasoning part
     def get_text(self, candidate: types.Candidate):
@@ -154,7 +337,11 @@ class WebAgent:
         return ret
 
     # Direct human Intervention
-    def _handle_safety_confirmation(self):
+    async def _handle_safety_confirmation(self):
+        if not self._interactive:
+            raise SafetyConfirmationRequired("Model requested human confirmation in non-interactive mode.")
+        # Show the pending turn before asking.
+        await self._side_tasks.drain()
         termcolor.cprint(
             "Require safety confirmation, direct human intervention.",
             color="yellow",
@@ -162,19 +349,28 @@ class WebAgent:
         )
         finish = ""
         while finish.lower() not in ("y", "n", "ye", "yes", "no"):
-            finish = input("Human intervention finished? ('yes' to continue/'no' to exit the program): ")
+            finish = await asyncio.to_thread(input, "Human intervention finished? ('yes' to continue/'no' to exit the program): ")
         print()
         if finish.lower() in ("n", "no"):
             termcolor.cprint("Exiting program", color="red")
             sys.exit(0)
 
-        return self.playwright.current_state()
+        return await self.playwright.current_state()
 
-    def run_one_iteration(self):
+    async def run_one_iteration(self):
+        self.tracer.iteration = self._iteration
+        dispatcher = None
         try:
-            response = self.get_model_response()
-        except Exception as e:
-            return "COMPLETE"
+            if self._stream:
+                dispatcher = _ActionDispatcher(self)
+                response = await self.get_streamed_model_response(dispatcher.submit)
+            else:
+                response = await self.get_model_response()
+        except Exception:
+            # The scheduler has already retried what can be retried.
+            if dispatcher is not None:
+                await dispatcher.cancel()
+            raise
 
         if not response.candidates:
             print("Response has no candidates!")
@@ -183,7 +379,7 @@ class WebAgent:
 
         candidate = response.candidates[0]
         if candidate.content:
-            self._contents.append(candidate.content)
+            self._append_history(candidate.content)
 
         reasoning = self.get_text(candidate)
         function_calls = self.extract_function_calls(candidate)
@@ -194,10 +390,18 @@ class WebAgent:
             and not reasoning
             and candidate.finish_reason == types.FinishReason.MALFORMED_FUNCTION_CALL
         ):
+            # A retried request uses up a turn too, so a model that keeps failing cannot outrun --max_turns.
+            try:
+                self.progress.check_turns(self._iteration + 1)
+            except RunAborted as e:
+                print(f"Agent Loop Aborted: {e}")
+                raise
             return "CONTINUE"
 
         if not function_calls:
+            await self._side_tasks.drain()
             print(f"Agent Loop Complete: {reasoning}")
+            self._final_reasoning = reasoning
             return "COMPLETE"
 
         function_call_strs = []
@@ -209,117 +413,737 @@ class WebAgent:
                     function_call_str += f"\n{key}: {value}"
             function_call_strs.append(function_call_str)
 
-        table = Table(expand=True)
-        table.add_column("Gemini Computer User Reasoning", header_style="magenta", ratio=1)
-        table.add_column("Function Call(s)", header_style="cyan", ratio=1)
-        table.add_row(reasoning, "\n".join(function_call_strs))
+        prompt_tokens, prompt_bytes = self._history.request_sizes[-1]
         if self._verbose:
-            self._console.print(table)
-            print()
+            await self._side_tasks.submit(self._render_turn(self._iteration, reasoning, function_call_strs, prompt_tokens, prompt_bytes))
 
         # Executing function calls
         # Skipping safety check for now
         function_responses = []
-        for idx, function_call in enumerate(function_calls):
-            extra_fr_fields = {}
-            if function_call.args and function_call.args.get("safety_decision"):
-                fc_result = self._handle_safety_confirmation()
-                extra_fr_fields["safety_acknowledgement"] = "true"
-            else:
-                fc_result = self.handle_action(function_call)
-
-            function_responses.append(
-                types.FunctionResponse(
-                    name=function_call.name,
-                    response={"url": fc_result.url, **extra_fr_fields},
-                    parts=[
-                        types.FunctionResponsePart(
-                            inline_data=types.FunctionResponseBlob(
-                                mime_type="image/png", data=fc_result.screenshot
-                            )
-                        )
-                    ]
-                )
+        turn_record = {
+            "iteration": self._iteration,
+            "reasoning": reasoning,
+            "function_calls": [],
+            "prompt_estimated_tokens": prompt_tokens,
+            "prompt_bytes": prompt_bytes,
+            "prompt_tokens": response.usage_metadata.prompt_token_count if response.usage_metadata else None,
+        }
+        if dispatcher is not None:
+            # Most of these already ran while the response was streaming.
+            executed = await dispatcher.finish()
+            if not executed[-1][0].observed:
+                # The last call was dispatched before it was known to be the last, so observe its result now.
+                executed[-1] = (await self.playwright.current_state(), *executed[-1][1:])
+        else:
+            executed = []
+            for idx, function_call in enumerate(function_calls):
+                observe = self._observe_every_action or idx == len(function_calls) - 1
+                executed.append(await self._execute_function_call(function_call, observe))
+
+        for idx, (function_call, (fc_result, extra_fr_fields, requires_confirmation)) in enumerate(zip(function_calls, executed)):
+            self._record_step(function_call, fc_result, requires_confirmation)
+
+            function_response, screenshot_name = await self._build_function_response(function_call, fc_result, idx, extra_fr_fields)
+            function_responses.append(function_response)
+            turn_record["function_calls"].append({
+                "name": function_call.name,
+                "args": dict(function_call.args or {}),
+                "url": fc_result.url,
+                "screenshot": screenshot_name,
+                "screenshot_hash": fc_result.frame_hash,
+                "unchanged": fc_result.unchanged,
+            })
+            self.progress.observe(
+                function_call.name,
+                dict(function_call.args or {}),
+                fc_result.url,
+                fc_result.frame_hash,
+                observed=fc_result.observed,
+                unchanged=fc_result.unchanged or fc_result.accessibility == NO_CHANGE_NOTE
             )
-            screenshot = Image.open(io.BytesIO(fc_result.screenshot))
-            screenshot.save(os.path.join(self._folder_path, f"{self._iteration}_{idx}.png"))
 
+        parts = [types.Part(function_response=fr) for fr in function_responses]
+        try:
+            hint = self.progress.check(self._iteration + 1)
+        except RunAborted as e:
+            turn_record["aborted"] = str(e)
+            await self._side_tasks.submit(self._artifacts.write_json(f"{self._iteration}.json", turn_record))
+            await self._side_tasks.drain()
+            print(f"Agent Loop Aborted: {e}")
+            raise
+        if hint is not None:
+            turn_record["hint"] = hint
+            parts.append(types.Part(text=hint))
+            if self._verbose:
+                self._console.print(f"[yellow]{hint}[/yellow]")
+
+        await self._side_tasks.submit(self._artifacts.write_json(f"{self._iteration}.json", turn_record))
+
+        # The next request is built from the history, so this is the only bookkeeping left on the critical path.
+        # It is O(1): the history strips screenshots from old turns and summarizes steps beyond its budget.
+        with self.tracer.span("history"):
+            self._append_history(types.Content(role="user", parts=parts))
+
+        return "CONTINUE"
+
+    async def _render_turn(self, iteration: int, reasoning: str, function_call_strs: list[str], prompt_tokens: int, prompt_bytes: int):
+        with self.tracer.span("render", track="background", iteration=iteration):
+            table = Table(expand=True)
+            table.add_column("Gemini Computer User Reasoning", header_style="magenta", ratio=1)
+            table.add_column("Function Call(s)", header_style="cyan", ratio=1)
+            table.add_row(reasoning, "\n".join(function_call_strs))
+            table.caption = f"Prompt: ~{prompt_tokens} tokens, {prompt_bytes} bytes"
+            await asyncio.to_thread(self._print_table, table)
 
-        self._contents.append(
-            types.Content(
-                role="user",
-                parts=[types.Part(function_response=fr) for fr in function_responses]
+    def _print_table(self, table: Table):
+        self._console.print(table)
+        print()
+
+    async def _persist(self, name: str, data: bytes, iteration: int):
+        with self.tracer.span("persist", track="background", bytes=len(data), iteration=iteration):
+            await self._artifacts.write_bytes(name, data)
+
+    async def _execute_function_call(self, function_call: types.FunctionCall, observe: bool = True):
+        """Run one function call, returning (observation, extra FunctionResponse fields, whether it needed confirmation)."""
+        extra_fr_fields = {}
+        requires_confirmation = bool(function_call.args and function_call.args.get("safety_decision"))
+        if requires_confirmation:
+            fc_result = await self._handle_safety_confirmation()
+            extra_fr_fields["safety_acknowledgement"] = "true"
+        else:
+            fc_result = await self.handle_action(function_call, observe)
+        return fc_result, extra_fr_fields, requires_confirmation
+
+    async def _build_function_response(self, function_call: types.FunctionCall, fc_result, idx: int, extra_fr_fields: dict):
+        """Turn an action's observation into a FunctionResponse and queue its screenshot for disk."""
+        if not fc_result.observed:
+            function_response = types.FunctionResponse(
+                name=function_call.name,
+                response={"url": fc_result.url, "note": NOT_OBSERVED_NOTE, **extra_fr_fields}
             )
+            return function_response, None
+
+        response = {"url": fc_result.url, **extra_fr_fields}
+        if fc_result.accessibility is not None:
+            response["accessibility_snapshot"] = fc_result.accessibility
+        if fc_result.screenshot is None:
+            return types.FunctionResponse(name=function_call.name, response=response), None
+
+        if fc_result.unchanged and self._last_screenshot_name is not None:
+            # Skip the image bytes and point at the screenshot the model already has.
+            function_response = types.FunctionResponse(
+                name=function_call.name,
+                response={**response, "note": UNCHANGED_SCREEN_NOTE}
+            )
+            return function_response, self._last_screenshot_name
+
+        function_response = types.FunctionResponse(
+            name=function_call.name,
+            response=response,
+            parts=[
+                types.FunctionResponsePart(
+                    inline_data=types.FunctionResponseBlob(
+                        mime_type=fc_result.mime_type, data=fc_result.screenshot
+                    )
+                )
+            ]
         )
+        # The bytes are already encoded, so they go to disk as-is on a background writer.
+        screenshot_name = f"{self._iteration}_{idx}.{fc_result.extension}"
+        await self._side_tasks.submit(self._persist(screenshot_name, fc_result.screenshot, self._iteration))
+        self._last_screenshot_name = screenshot_name
+        return function_response, screenshot_name
 
-        # only keep screenshots in the few most recent turns, remove the screenshot images from the old turns.
-        turn_with_screenshots_found = 0
-        for content in reversed(self._contents):
-            if content.role == "user" and content.parts:
-                turn_with_screenshots_found += 1
-                # remove the screenshot image if the number of screenshots exceed the limit.
-                if turn_with_screenshots_found > MAX_RECENT_TURN_WITH_SCREENSHOTS:
-                    for part in content.parts:
-                        if (
-                                part.function_response
-                                and part.function_response.parts
-                                and part.function_response.name
-                        ):
-                            part.function_response.parts = None
+    def _record_step(self, function_call: types.FunctionCall, fc_result, requires_confirmation: bool = False):
+        if self._trajectory is not None:
+            self._trajectory.record(
+                turn=self._iteration,
+                name=function_call.name,
+                args=dict(function_call.args or {}),
+                pre_url=self._last_url,
+                pre_frame_hash=self._last_frame_hash,
+                post_url=fc_result.url,
+                post_frame_hash=fc_result.frame_hash,
+                requires_confirmation=requires_confirmation
+            )
+        self._last_url = fc_result.url
+        self._last_frame_hash = fc_result.frame_hash
 
-        return "CONTINUE"
+    async def replay(self, trajectory: Trajectory):
+        """Re-execute recorded actions through handle_action without calling the model.
+
+        Before every step, the current URL and screenshot hash are checked against the recording; replay stops
+        at the first divergence or at a step that needed human confirmation. Returns the replayed turns as
+        (model content, user content) pairs, ready to be put into the history, and whether every step ran and
+        left the page where the recorded run ended.
+        """
+        turns = []
+        function_calls, function_responses = [], []
+        turn = None
+        completed = True
+        for step_idx, step in enumerate(trajectory.steps):
+            if step["requires_confirmation"] or not self._trajectory_store.matches(step, self._last_url, self._last_frame_hash):
+                completed = False
+                break
+            if step["turn"] != turn and function_calls:
+                turns.append(self._replayed_turn(function_calls, function_responses))
+                function_calls, function_responses = [], []
+                self._iteration += 1
+            turn = step["turn"]
+
+            function_call = types.FunctionCall(name=step["name"], args=step["args"])
+            last_in_turn = step_idx == len(trajectory.steps) - 1 or trajectory.steps[step_idx + 1]["turn"] != turn
+            fc_result = await self.handle_action(function_call, self._observe_every_action or last_in_turn)
+            self._record_step(function_call, fc_result)
+            function_response, _ = await self._build_function_response(function_call, fc_result, len(function_calls), {})
+            function_calls.append(function_call)
+            function_responses.append(function_response)
+            if self._verbose:
+                self._console.print(f"[cyan]Replayed[/cyan] {step['name']} {step['args']} -> {fc_result.url}")
+
+        if function_calls:
+            turns.append(self._replayed_turn(function_calls, function_responses))
+            self._iteration += 1
+        if completed and trajectory.steps:
+            # The last step has no next step to check it, e.g. a submit that now shows an error page.
+            completed = self._trajectory_store.matches_outcome(trajectory.steps[-1], self._last_url, self._last_frame_hash)
+        await self._side_tasks.drain()
+        await self._artifacts.flush()
+        return turns, completed
 
-    def _generate_plan(self, user_query: str):
-        response = self._client.models.generate_content(
-            model="gemini-2.5-flash",
-            config=self._gemini_flash_use_generation_content_config,
-            contents=user_query
+    @staticmethod
+    def _replayed_turn(function_calls: list[types.FunctionCall], function_responses: list[types.FunctionResponse]):
+        return (
+            types.Content(role="model", parts=[types.Part(function_call=fc) for fc in function_calls]),
+            types.Content(role="user", parts=[types.Part(function_response=fr) for fr in function_responses])
         )
-        plan_query = f"User query: {user_query}\nPlan:\n{response.text}"
+
+    async def _generate_plan(self, user_query: str, use_cache: bool = True):
+        plan = None
+        use_cache = use_cache and self._plan_cache is not None
+        if use_cache:
+            plan = await self._plan_cache.get(user_query, self._planner_prompt_hash, PLANNER_MODEL)
+        cached = plan is not None
+        if not cached:
+            with self.tracer.span("plan") as span:
+                response = await self._scheduler.call(
+                    PLANNER_MODEL,
+                    lambda: self._client.aio.models.generate_content(
+                        model=PLANNER_MODEL,
+                        config=self._gemini_flash_use_generation_content_config,
+                        contents=user_query
+                    ),
+                    span=span
+                )
+            plan = response.text
+            if use_cache and plan:
+                await self._plan_cache.put(user_query, self._planner_prompt_hash, PLANNER_MODEL, plan)
+        plan_query = f"User query: {user_query}\nPlan:\n{plan}"
         if self._verbose:
+            title = "[bold magenta]Execution Plan[/bold magenta]" + (" (cached)" if cached else "")
             self._console.print(
-                Panel(response.text, title="[bold magenta]Execution Plan[/bold magenta]", border_style="green"),
+                Panel(plan, title=title, border_style="green"),
                 justify="left"
             )
             print()
         return plan_query
 
-    def start_agent_loop(self, plan_query: str, clear_content_history: bool = False):
+    async def _observation_parts(self, state, screenshot_name: str) -> list[types.Part]:
+        parts = [types.Part(text=f"Current URL: {state.url}")]
+        if state.accessibility is not None:
+            parts.append(types.Part(text=state.accessibility))
+        if state.screenshot is not None:
+            parts.append(types.Part(inline_data=types.Blob(mime_type=state.mime_type, data=state.screenshot)))
+            screenshot_name = f"{screenshot_name}.{state.extension}"
+            await self._side_tasks.submit(self._persist(screenshot_name, state.screenshot, self._iteration))
+            self._last_screenshot_name = screenshot_name
+        return parts
+
+    async def _first_message(self, plan_query: str, initial_state=None) -> types.Content:
+        parts = [types.Part(text=plan_query)]
+        if initial_state is not None and initial_state.observed:
+            # The model sees the start page right away instead of spending its first turn on open_web_browser.
+            parts += await self._observation_parts(initial_state, "initial")
+        return types.Content(role="user", parts=parts)
+
+    def _append_history(self, content: types.Content):
+        if self._checkpoint is not None:
+            # Taken now, because the history strips the screenshots of older turns in place.
+            self._checkpoint_pending.append(snapshot_content(content))
+        self._history.append(content)
+        if self._history.snapshot_base_lost:
+            # The remaining accessibility diffs no longer have a full snapshot to apply to.
+            self.playwright.reset_accessibility()
+            self._history.snapshot_base_lost = False
+
+    async def _save_checkpoint(self, status: str, reset: bool = False):
+        if self._checkpoint is None:
+            return
+        contents, self._checkpoint_pending = self._checkpoint_pending, []
+        state = {
+            "query": self._query,
+            "iteration": self._iteration,
+            "url": self.playwright.url,
+            "status": status,
+            "final_reasoning": self._final_reasoning,
+        }
+        await self._side_tasks.submit(self._write_checkpoint(contents, state, reset))
+
+    async def _write_checkpoint(self, contents: list[dict], state: dict, reset: bool):
+        with self.tracer.span("checkpoint", track="background", contents=len(contents), iteration=state["iteration"]):
+            # The conversation goes first: a missed storage state only costs cookies, a missed turn corrupts the log.
+            await self._checkpoint.save(contents, state, reset)
+            if state["status"] != "complete":
+                try:
+                    await self.playwright.save_storage_state(self._checkpoint.storage_state_path)
+                except Exception as e:
+                    # e.g. the page is navigating or the context is closing; the next turn saves it again.
+                    print(f"Failed to checkpoint the browser storage state: {e}")
+
+    async def start_agent_loop(self, plan_query: str, clear_content_history: bool = False, replayed_turns: list = None, initial_state=None):
+        await self.start()
         self._iteration = 0
+        self._final_reasoning = None
+        self.progress.reset()
 
-        new_message = types.Content(
-                    role="user",
-                    parts=[types.Part(text=plan_query)]
-                )
+        new_message = await self._first_message(plan_query, initial_state)
         if clear_content_history:
-            self._contents = [new_message]
-        else:
-            self._contents.append(new_message)
+            self._history.clear()
+        # A new conversation starts a new checkpoint log.
+        reset_checkpoint = len(self._history) == 0
+        self._checkpoint_pending = []
+        self._append_history(new_message)
+        # Steps already executed by a replay are presented to the model as if it had taken them.
+        for model_content, user_content in replayed_turns or []:
+            self._append_history(model_content)
+            self._append_history(user_content)
+            self._iteration += 1
+        await self._save_checkpoint("running", reset=reset_checkpoint)
+        return await self._agent_loop()
+
+    async def resume(self):
+        """Continue the run checkpointed in this agent's screenshot folder, returning the model's final reasoning.
 
+        The conversation is restored up to the last completed turn, the browser is expected to have been created
+        with the checkpointed storage state, and the model is shown the current page before it continues.
+        """
+        if self._checkpoint is None or not self._checkpoint.exists():
+            raise FileNotFoundError(f"No checkpoint to resume in {self._folder_path}")
+        state = await self._checkpoint.load_state()
+        self._query = state["query"]
+        if state["status"] == "complete":
+            print(f"Agent Loop Complete (resumed): {state['final_reasoning']}")
+            self._final_reasoning = state["final_reasoning"]
+            return self._final_reasoning
+        contents = await self._checkpoint.load_contents(state["entries"])
+        await self._checkpoint.truncate(state["entries"])
+
+        await self.start()
+        if self.playwright.url != state["url"]:
+            await self.playwright.navigate(state["url"], observe=False)
+        current_state = await self.playwright.current_state()
+        self._last_url, self._last_frame_hash = current_state.url, current_state.frame_hash
+        self._iteration = state["iteration"]
+        self._final_reasoning = None
+        self.progress.reset()
+        self._history.clear()
+        for content in contents:
+            self._history.append(content)
+        self._checkpoint_pending = []
+        parts = [types.Part(text=RESUMED_NOTE)] + await self._observation_parts(current_state, f"resumed_{self._iteration}")
+        self._append_history(types.Content(role="user", parts=parts))
+        await self._save_checkpoint("running")
+        if self._verbose:
+            self._console.print(f"[yellow]Resumed after {self._iteration} turns at {current_state.url}[/yellow]")
+        return await self._agent_loop()
+
+    async def _agent_loop(self):
         status = "CONTINUE"
-        while status == "CONTINUE":
-            status = self.run_one_iteration()
-            self._iteration += 1
+        try:
+            while status == "CONTINUE":
+                with self.tracer.span("iteration"):
+                    status = await self.run_one_iteration()
+                self._iteration += 1
+                await self._save_checkpoint("complete" if status == "COMPLETE" else "running")
+        finally:
+            self.tracer.iteration = None
+            await self._side_tasks.drain()
+            await self._write_trace()
+            # Make sure everything the run produced is on disk, even if it ended with an exit or an error.
+            await self._artifacts.flush()
+        if self._verbose:
+            self._console.print(self.tracer.summary_table())
+        if self._verbose and self.playwright.frame_cache is not None:
+            stats = self.playwright.frame_cache.stats()
+            self._console.print(
+                f"Unchanged screenshots skipped: {stats['hits']}/{stats['frames']} ({stats['hit_rate']:.0%}), "
+                f"saved {stats['bytes_saved']} bytes and ~{stats['estimated_tokens_saved']} tokens"
+            )
+        if self._verbose and COMPUTER_USE_MODEL in self._scheduler.stats():
+            stats = self._scheduler.stats()[COMPUTER_USE_MODEL]
+            self._console.print(
+                f"Model requests: {stats['requests']}, retries: {stats['retries']} ({stats['rate_limited']} rate limited), "
+                f"hedged: {stats['hedges']} ({stats['hedge_wins']} won), queue p95: {stats['p95_queue_ms']:.0f} ms"
+            )
+        if self._verbose:
+            stats = self.progress.stats()
+            self._console.print(f"Loops detected: {stats['loops']}, stalls detected: {stats['stalls']}, hints sent: {stats['hints']}")
+        return self._final_reasoning
 
-    def main(self):
-        user_query = input("Please input the task: ")
-        plan_query = self._generate_plan(user_query)
-        self.start_agent_loop(plan_query)
+    @property
+    def iteration(self):
+        return self._iteration
+
+    async def _write_trace(self):
+        await self._artifacts.write_bytes("trace.jsonl", self.tracer.to_jsonl().encode("utf-8"))
+        await self._artifacts.write_json("trace.json", self.tracer.to_chrome_trace())
+
+    async def run(self, user_query: str, use_plan_cache: bool = True, replay: bool = True):
+        """Plan and execute a single task, returning the model's final reasoning.
+
+        With a trajectory store, a recorded run of the same task is replayed first and the model is only asked
+        to take over from where the page diverged. Runs that complete are recorded for the next time.
+
+        The planner does not need the browser, so it runs while the browser starts and the initial page loads,
+        and the first request to the computer-use model already carries a screenshot of that page.
+        """
+        self._query = user_query
+        recorded = None
+        if self._trajectory_store is not None and replay:
+            recorded = await self._trajectory_store.load(user_query, self.playwright.initial_url)
+        # A replay that runs to the end never needs a plan, so only plan ahead when there is nothing to replay.
+        planning = None
+        if recorded is None:
+            planning = asyncio.ensure_future(self._generate_plan(user_query, use_cache=use_plan_cache))
+        try:
+            await self.start()
+            # Observed before replaying too, so the first recorded step is checked against the screen and not only
+            # the URL (e.g. a logged-out page at the same address).
+            observed_state = await self.playwright.current_state()
+            self._last_url, self._last_frame_hash = observed_state.url, observed_state.frame_hash
+            replayed_turns = []
+            if self._trajectory_store is not None:
+                self._trajectory = Trajectory(user_query, self.playwright.initial_url)
+            if recorded is not None:
+                self._iteration = 0
+                replayed_turns, completed = await self.replay(recorded)
+                if completed and recorded.final_reasoning is not None:
+                    print(f"Agent Loop Complete (replayed {len(recorded.steps)} steps): {recorded.final_reasoning}")
+                    self._final_reasoning = recorded.final_reasoning
+                    return self._final_reasoning
+                if self._verbose:
+                    self._console.print(f"[yellow]Replay diverged after {len(self._trajectory.steps)} steps, handing over to the model.[/yellow]")
+
+            # Without replayed turns the model starts from the page as observed above.
+            initial_state = None if replayed_turns else observed_state
+            if planning is not None:
+                plan_query = await planning
+            else:
+                plan_query = await self._generate_plan(user_query, use_cache=use_plan_cache)
+        finally:
+            if planning is not None and not planning.done():
+                planning.cancel()
+        result = await self.start_agent_loop(plan_query, replayed_turns=replayed_turns, initial_state=initial_state)
+        if self._trajectory is not None and self._final_reasoning is not None:
+            self._trajectory.final_reasoning = self._final_reasoning
+            await self._trajectory_store.save(self._trajectory)
+        return result
+
+    async def main(self, replay: bool = True):
+        # The browser launches while the user is still typing the task.
+        self._begin_startup()
+        user_query = await asyncio.to_thread(input, "Please input the task: ")
+        await self.run(user_query, replay=replay)
+
+
+class _SideTasks:
+    """Runs work the next model request does not depend on (rendering, artifacts) in order, in the background.
+
+    Failures are reported and do not stop the agent. drain() waits for everything submitted so far.
+    At most max_pending steps wait at a time: when the background falls behind (e.g. a slow disk), submit()
+    waits for a free slot, so screenshots are not buffered in memory without bound.
+    """
+
+    def __init__(self, max_pending: int = 16, tracer: Tracer = None):
+        self._max_pending = max_pending
+        self._tracer = tracer or Tracer()
+        self._queue = None
+        self._task = None
+
+    async def submit(self, coro):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self._max_pending)
+            self._task = asyncio.create_task(self._run())
+        if self._queue.full():
+            with self._tracer.span("side_task_backpressure"):
+                await self._queue.put(coro)
+        else:
+            self._queue.put_nowait(coro)
+
+    async def _run(self):
+        while True:
+            coro = await self._queue.get()
+            try:
+                await coro
+            except Exception as e:
+                print(f"Background step failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def drain(self):
+        if self._task is not None:
+            await self._queue.join()
+
+    async def close(self):
+        await self.drain()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def _continues_text(previous: types.Part, part: types.Part) -> bool:
+    """Whether a streamed text part continues the previous one instead of starting a new part."""
+    return (
+        previous is not None
+        and previous.text is not None
+        and part.text is not None
+        and not previous.thought_signature
+        and bool(previous.thought) == bool(part.thought)
+    )
+
+
+class _ActionDispatcher:
+    """Executes the function calls of a streaming response in order, as they arrive.
+
+    Whether a call is the last one of the turn is only known once the stream ends, so calls are not
+    observed (unless the agent observes every action) and the caller observes the last one afterwards.
+    """
+
+    def __init__(self, agent: AsyncWebAgent):
+        self._agent = agent
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._results = []
+
+    def submit(self, function_call: types.FunctionCall):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        self._queue.put_nowait(function_call)
+
+    async def _run(self):
+        while True:
+            function_call = await self._queue.get()
+            if function_call is None:
+                return
+            self._results.append(
+                await self._agent._execute_function_call(function_call, self._agent._observe_every_action)
+            )
+
+    async def finish(self) -> list:
+        if self._task is None:
+            return []
+        self._queue.put_nowait(None)
+        await self._task
+        return self._results
+
+    async def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class WebAgent:
+    """Blocking facade over AsyncWebAgent that shares the event loop of its PlaywrightComputer."""
+
+    def __init__(
+            self,
+            verbose: bool = True,
+            console: Console = None,
+            context_state_path: str = None,
+            initial_url: str = None,
+            computer: PlaywrightComputer = None,
+            client: genai.Client = None,
+            screenshot_dir: str = None,
+            interactive: bool = True,
+            history: ConversationHistory = None,
+            plan_cache: PlanCache = None,
+            trajectory_store: TrajectoryStore = None,
+            observe_every_action: bool = False,
+            tracer: Tracer = None,
+            stream: bool = False,
+            scheduler: RequestScheduler = None,
+            progress: ProgressMonitor = None,
+            checkpoint: bool = True
+    ):
+        self._owns_computer = computer is None
+        if computer is None:
+            computer = PlaywrightComputer(PLAYWRIGHT_SCREEN_SIZE, context_state_path=context_state_path, initial_url=initial_url, launch=False)
+        self.playwright = computer
+        self._loop = computer.loop
+        self._agent = AsyncWebAgent(
+            verbose=verbose,
+            console=console,
+            computer=computer.async_computer,
+            client=client,
+            screenshot_dir=screenshot_dir,
+            interactive=interactive,
+            history=history,
+            plan_cache=plan_cache,
+            trajectory_store=trajectory_store,
+            observe_every_action=observe_every_action,
+            tracer=tracer,
+            stream=stream,
+            scheduler=scheduler,
+            progress=progress,
+            checkpoint=checkpoint
+        )
+
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    def start(self):
+        self._run(self._agent.start())
+
+    def close(self):
+        self._run(self._agent.close())
+        if self._owns_computer:
+            self.playwright.close()
+
+    def denormalize_x(self, x: int):
+        return self._agent.denormalize_x(x)
+
+    def denormalize_y(self, y: int):
+        return self._agent.denormalize_y(y)
+
+    def handle_action(self, action: types.FunctionCall, observe: bool = True):
+        return self._run(self._agent.handle_action(action, observe))
+
+    def get_model_response(self):
+        return self._run(self._agent.get_model_response())
+
+    def get_streamed_model_response(self, on_function_call=None):
+        return self._run(self._agent.get_streamed_model_response(on_function_call))
+
+    def get_text(self, candidate: types.Candidate):
+        return self._agent.get_text(candidate)
+
+    def extract_function_calls(self, candidate: types.Candidate) -> list[types.FunctionCall]:
+        return self._agent.extract_function_calls(candidate)
+
+    def run_one_iteration(self):
+        return self._run(self._agent.run_one_iteration())
+
+    def start_agent_loop(self, plan_query: str, clear_content_history: bool = False):
+        return self._run(self._agent.start_agent_loop(plan_query, clear_content_history))
+
+    @property
+    def iteration(self):
+        return self._agent.iteration
+
+    @property
+    def progress(self):
+        return self._agent.progress
+
+    def run(self, user_query: str, use_plan_cache: bool = True, replay: bool = True):
+        return self._run(self._agent.run(user_query, use_plan_cache, replay))
+
+    def replay(self, trajectory: Trajectory):
+        return self._run(self._agent.replay(trajectory))
+
+    def resume(self):
+        return self._run(self._agent.resume())
+
+    def main(self, replay: bool = True):
+        self._run(self._agent.main(replay))
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("--verbose", action="store_true")
     parser.add_argument("--auth_state", type=str, required=False)
     parser.add_argument("--initial_url", type=str, required=False)
+    parser.add_argument("--settle_timeout", type=float, default=5.0, help="Max seconds to wait for a page to settle after each action.")
+    parser.add_argument("--screenshot_format", type=str, default="png", choices=["png", "jpeg", "webp"])
+    parser.add_argument("--screenshot_quality", type=int, default=80, help="Quality of jpeg/webp screenshots (1-100).")
+    parser.add_argument("--screenshot_max_width", type=int, required=False, help="Downscale screenshots to this width before upload.")
+    parser.add_argument("--dedupe_screenshots", action="store_true", help="Send a short note instead of screenshots that did not change.")
+    parser.add_argument("--max_prompt_tokens", type=int, required=False, help="Summarize the oldest steps once a request would exceed this many tokens.")
+    parser.add_argument("--no_plan_cache", action="store_true", help="Always ask the planner instead of reusing a cached plan.")
+    parser.add_argument("--no_replay", action="store_true", help="Do not replay a recorded trajectory of the same task, always ask the model.")
+    parser.add_argument("--observe_every_action", action="store_true", help="Screenshot every action of a multi-action turn, not only the last.")
+    parser.add_argument("--resume", type=str, required=False, help="Continue the interrupted run whose screenshots are in this folder.")
+    parser.add_argument("--no_checkpoint", action="store_true", help="Do not checkpoint the run after every turn.")
+    parser.add_argument("--max_turns", type=int, default=MAX_TURNS, help="Abort the task after this many model turns.")
+    parser.add_argument("--max_stuck_hints", type=int, default=2, help="Hints sent about a detected loop or stall before the task is aborted.")
+    parser.add_argument("--stream", action="store_true", help="Stream model responses and start executing actions before the response is complete.")
+    parser.add_argument("--requests_per_minute", type=float, required=False, help="Limit on requests per minute to each model, shared by all agents in the process.")
+    parser.add_argument("--max_retries", type=int, default=4, help="Retries of rate-limited, failed or timed out model requests.")
+    parser.add_argument("--hedge", action="store_true", help="Send a duplicate of model requests slower than the p95 latency and keep the first reply.")
+    parser.add_argument("--observation_backend", type=str, default="screenshot", choices=["screenshot", "screencast"], help="Capture a screenshot per observation, or use the latest frame of a CDP screencast.")
+    parser.add_argument("--observation_mode", type=str, default="screenshot", choices=["screenshot", "accessibility", "hybrid"], help="Observe pages as screenshots, accessibility snapshots, or both with a downscaled screenshot.")
+    parser.add_argument("--type_with_key_events", action="store_true", help="Type text one key event per character instead of filling fields at once.")
+    parser.add_argument("--headless", action="store_true", help="Run Chromium without a visible window.")
+    parser.add_argument("--block_resource_types", type=str, required=False, help="Comma separated resource types to block, e.g. 'media,font'.")
+    parser.add_argument("--block_trackers", action="store_true", help="Block common analytics, ads and session-recording domains.")
+    parser.add_argument("--asset_cache_dir", type=str, required=False, help="Serve static assets from an on-disk cache shared across runs.")
+    parser.add_argument("--har_path", type=str, required=False)
+    parser.add_argument("--har_mode", type=str, required=False, choices=["record", "replay"], help="Record traffic to --har_path or replay it offline.")
     args = parser.parse_args()
 
+    computer_kwargs = {
+        "context_state_path": args.auth_state,
+        "settle_policy": SettlePolicy(timeout=args.settle_timeout),
+        "screenshot_encoding": ScreenshotEncoding(args.screenshot_format, args.screenshot_quality, args.screenshot_max_width),
+        "frame_cache": FrameCache() if args.dedupe_screenshots else None,
+        "headless": args.headless,
+        "bulk_text_entry": not args.type_with_key_events,
+        "observation_backend": args.observation_backend,
+        "observation_mode": args.observation_mode,
+        "routing": make_routing_policy(args.block_resource_types, args.block_trackers, args.asset_cache_dir, args.har_path, args.har_mode)
+    }
+    if args.initial_url:
+        computer_kwargs["initial_url"] = args.initial_url
+    if args.resume:
+        # Reopen the browser where the run left off, with its cookies and local storage.
+        checkpoint = Checkpoint(os.path.join(args.resume, CHECKPOINT_DIR))
+        computer_kwargs["initial_url"] = checkpoint.read_state()["url"]
+        if os.path.exists(checkpoint.storage_state_path):
+            computer_kwargs["context_state_path"] = checkpoint.storage_state_path
+    # The agent launches the browser itself, concurrently with reading the task and planning.
+    computer = PlaywrightComputer(PLAYWRIGHT_SCREEN_SIZE, launch=False, **computer_kwargs)
     agent = WebAgent(
         verbose=args.verbose,
         console=Console(),
-        context_state_path=args.auth_state,
-        initial_url=args.initial_url
+        computer=computer,
+        history=ConversationHistory(
+            max_turns_with_screenshots=MAX_RECENT_TURN_WITH_SCREENSHOTS,
+            max_tokens=args.max_prompt_tokens
+        ),
+        plan_cache=None if args.no_plan_cache else PlanCache(),
+        trajectory_store=TrajectoryStore(),
+        observe_every_action=args.observe_every_action,
+        stream=args.stream,
+        progress=ProgressMonitor(max_turns=args.max_turns, max_hints=args.max_stuck_hints),
+        screenshot_dir=args.resume,
+        checkpoint=not args.no_checkpoint,
+        scheduler=RequestScheduler(
+            requests_per_minute={model: args.requests_per_minute for model in (PLANNER_MODEL, COMPUTER_USE_MODEL)} if args.requests_per_minute else None,
+            max_retries=args.max_retries,
+            hedge=args.hedge
+        )
     )
-    agent.main()
+    try:
+        if args.resume:
+            agent.resume()
+        else:
+            agent.main(replay=not args.no_replay)
+    except RunAborted as e:
+        # The reason was already printed when the run was aborted.
+        sys.exit(f"Task aborted: {e}")
+    finally:
+        # Also writes a HAR being recorded, which Playwright only does when the context closes.
+        agent.close()
+        computer.close()
 
 
 